@@ -0,0 +1,333 @@
+"""
+Semantic answer cache for the RAG QA chain.
+
+- Stores answers with their source documents in SQLite, next to the question embedding
+- A new question is answered from the cache when its embedding's cosine similarity to a
+  cached question reaches ANSWER_CACHE_THRESHOLD (exact NumPy search over the cached vectors)
+  and both questions have the same content words, so questions that differ only in the
+  entity they name ("... in the OKR module" / "... in the Pulse module") are not mixed up
+- Entries are tied to the index version (see rag_pipeline.index_version) and dropped
+  automatically once the Chroma index is rebuilt or refreshed
+- Entries are also namespaced by LLM model and prompt, so changing either starts afresh
+"""
+
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+
+import numpy as np
+from langchain_core.documents import Document
+
+from log_utils import debug_log
+from config import ANSWER_CACHE_PATH, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_MAX_ENTRIES
+from search_utils import tokenize, STOPWORDS
+
+
+def serialize_documents(docs):
+    """
+    Returns source documents as a JSON string.
+    """
+    return json.dumps(
+        [{"page_content": d.page_content, "metadata": d.metadata} for d in docs]
+    )
+
+
+def deserialize_documents(payload):
+    """
+    Rebuilds source documents from serialize_documents output.
+    """
+    return [Document(**d) for d in json.loads(payload)]
+
+
+def content_terms(question):
+    """
+    Returns the words of question that carry its meaning: stopwords and one-letter tokens
+    are dropped and plurals folded ("modules" -> "module").
+    """
+    return {
+        t[:-1] if len(t) > 3 and t.endswith("s") else t
+        for t in tokenize(question)
+        if len(t) > 1 and t not in STOPWORDS
+    }
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class AnswerCache:
+    """
+    SQLite-backed store of (question embedding, answer, sources) per index version.
+    The embeddings of the active version/namespace are held in memory as a normalized
+    matrix, so a lookup is one matrix-vector product. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path=ANSWER_CACHE_PATH,
+        threshold=ANSWER_CACHE_THRESHOLD,
+        max_entries=ANSWER_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._scope = None
+        self._ids = []
+        self._matrix = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                index_version TEXT NOT NULL,
+                namespace TEXT NOT NULL,
+                question TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                answer TEXT NOT NULL,
+                sources TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_answers_scope ON answers (index_version, namespace)"
+        )
+        self._conn.commit()
+
+    def _use_scope(self, index_version, namespace):
+        """
+        Loads the embeddings for (index_version, namespace), dropping entries of other index versions.
+        """
+        if self._scope == (index_version, namespace):
+            return
+        deleted = self._conn.execute(
+            "DELETE FROM answers WHERE index_version != ?", (index_version,)
+        ).rowcount
+        self._conn.commit()
+        if deleted:
+            debug_log(
+                f"Answer cache dropped {deleted} entries from older index versions"
+            )
+        rows = self._conn.execute(
+            "SELECT id, embedding FROM answers WHERE index_version = ? AND namespace = ?",
+            (index_version, namespace),
+        ).fetchall()
+        self._scope = (index_version, namespace)
+        self._ids = [row[0] for row in rows]
+        self._matrix = (
+            np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+            if rows
+            else None
+        )
+
+    def lookup(self, index_version, namespace, embedding, question=None):
+        """
+        Returns (answer, source documents, similarity) of the closest cached question within
+        the threshold, or None. If question is given, only cached questions with the same
+        content words are considered.
+        """
+        query = _unit(embedding)
+        terms = content_terms(question) if question is not None else None
+        with self._lock:
+            self._use_scope(index_version, namespace)
+            if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+            similarities = self._matrix @ query
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for best in candidates[np.argsort(-similarities[candidates])]:
+                entry_id = self._ids[best]
+                cached_question, answer, sources = self._conn.execute(
+                    "SELECT question, answer, sources FROM answers WHERE id = ?",
+                    (entry_id,),
+                ).fetchone()
+                if terms is not None and content_terms(cached_question) != terms:
+                    continue
+                self._conn.execute(
+                    "UPDATE answers SET last_used = ? WHERE id = ?",
+                    (time.time(), entry_id),
+                )
+                self._conn.commit()
+                self.hits += 1
+                return answer, deserialize_documents(sources), float(similarities[best])
+            if len(candidates):
+                debug_log(
+                    f"Answer cache: {len(candidates)} similar questions with different "
+                    f"content words, not reused"
+                )
+            self.misses += 1
+        return None
+
+    def put(self, index_version, namespace, question, embedding, answer, source_docs):
+        """
+        Stores an answer and evicts the least recently used entries beyond max_entries.
+        """
+        vector = _unit(embedding)
+        now = time.time()
+        with self._lock:
+            self._use_scope(index_version, namespace)
+            cursor = self._conn.execute(
+                "INSERT INTO answers (index_version, namespace, question, embedding, answer, "
+                "sources, created, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    index_version,
+                    namespace,
+                    question,
+                    vector.tobytes(),
+                    answer,
+                    serialize_documents(source_docs),
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+            self._ids.append(cursor.lastrowid)
+            self._matrix = (
+                vector[None, :]
+                if self._matrix is None
+                else np.vstack([self._matrix, vector])
+            )
+            self._evict()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        self._conn.execute(
+            "DELETE FROM answers WHERE id IN "
+            "(SELECT id FROM answers ORDER BY last_used ASC LIMIT ?)",
+            (count - self.max_entries,),
+        )
+        self._conn.commit()
+        debug_log(f"Answer cache evicted {count - self.max_entries} entries")
+        # Reload the in-memory matrix for the current scope
+        scope, self._scope = self._scope, None
+        self._use_scope(*scope)
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the number of stored answers.
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def answer_cache_namespace(llm, prompt):
+    """
+    Returns the cache namespace for answers produced by llm with prompt.
+    """
+    model = getattr(llm, "model_name", None) or type(llm).__name__
+    return model_namespace(model, prompt)
+
+
+def model_namespace(model, prompt):
+    """
+    Returns the cache namespace for answers produced by the model named model with prompt.
+    """
+    digest = hashlib.sha1(prompt.template.encode("utf-8")).hexdigest()[:12]
+    return f"{model}:{digest}"
+
+
+class CachedQAChain:
+    """
+    Wraps a RetrievalQA chain: invoke({"query": ...}) returns a cached answer (with
+    "cached": True) for semantically equivalent questions asked against the same index,
+    and otherwise runs the chain and stores its result. stream_answer(question) does the
+    same with token streaming (see answer_stream). Questions for which skip(question) is
+    true (e.g. people lookups, where near-identical questions name different people) are
+    neither served from nor stored in the cache.
+    """
+
+    def __init__(
+        self, chain, embed_query, index_version, namespace, cache=None, skip=None
+    ):
+        self.chain = chain
+        self.embed_query = embed_query
+        self.index_version = index_version
+        self.namespace = namespace
+        self.cache = cache if cache is not None else AnswerCache()
+        self.skip = skip
+
+    def _lookup(self, question):
+        """
+        Returns (index version, question embedding, cached result or None).
+        """
+        if self.skip is not None and self.skip(question):
+            debug_log("Answer cache skipped for this question")
+            return None, None, None
+        version = self.index_version()
+        if version is None:
+            return None, None, None
+        started = time.perf_counter()
+        embedding = self.embed_query(question)
+        cached = self.cache.lookup(version, self.namespace, embedding, question)
+        if cached is None:
+            return version, embedding, None
+        answer, source_docs, similarity = cached
+        debug_log(
+            f"Answer cache hit (similarity {similarity:.3f}) in "
+            f"{(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        result = {
+            "query": question,
+            "result": answer,
+            "source_documents": source_docs,
+            "cached": True,
+        }
+        return version, embedding, result
+
+    def _store(self, version, question, embedding, result):
+        if version is not None and result.get("result"):
+            self.cache.put(
+                version,
+                self.namespace,
+                question,
+                embedding,
+                result["result"],
+                result.get("source_documents", []),
+            )
+
+    def invoke(self, inputs, **kwargs):
+        question = inputs["query"]
+        version, embedding, cached = self._lookup(question)
+        if cached is not None:
+            return cached
+        result = self.chain.invoke(inputs, **kwargs)
+        self._store(version, question, embedding, result)
+        return result
+
+    def stream_answer(self, question):
+        """
+        Streaming counterpart of invoke: returns an AnswerStream, served from the cache when
+        possible; a streamed answer is stored once it completes.
+        """
+        from answer_stream import AnswerStream, stream_qa_chain
+
+        version, embedding, cached = self._lookup(question)
+        if cached is not None:
+            return AnswerStream.from_result(cached)
+        return stream_qa_chain(
+            self.chain,
+            question,
+            on_complete=lambda result: self._store(
+                version, question, embedding, result
+            ),
+        )
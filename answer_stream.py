@@ -0,0 +1,110 @@
+"""
+Token streaming for RAG answers.
+
+- Runs the same retrieval and "stuff" prompt as the RetrievalQA chain, but streams the
+  LLM output token by token instead of blocking until the whole answer is generated
+- Source documents and the full result are available once the stream is exhausted
+- Questions routed to the no-retrieval path stream a general-knowledge answer instead
+- Time-to-first-token is measured from the moment the question is received (so it
+  includes retrieval) and logged together with the total generation time
+"""
+
+import time
+
+from langchain_core.prompts import format_document
+
+from log_utils import debug_log
+
+
+class AnswerStream:
+    """
+    Iterable over the tokens of an answer. Once exhausted, result holds the QA result
+    ({"query", "result", "source_documents"}) in the same shape as RetrievalQA.invoke, and
+    first_token_seconds / total_seconds the measured latencies. retrieval is False for
+    answers generated without looking at the documentation.
+    """
+
+    def __init__(
+        self,
+        question,
+        source_documents,
+        tokens,
+        started=None,
+        on_complete=None,
+        cached=False,
+        retrieval=True,
+    ):
+        self.question = question
+        self.source_documents = source_documents
+        self.started = started if started is not None else time.perf_counter()
+        self.cached = cached
+        self.retrieval = retrieval
+        self.result = None
+        self.first_token_seconds = None
+        self.total_seconds = None
+        self._tokens = tokens
+        self._on_complete = on_complete
+
+    @classmethod
+    def from_result(cls, result):
+        """
+        Wraps an already computed QA result (e.g. from a cache) as a single-token stream.
+        """
+        return cls(
+            result["query"],
+            result.get("source_documents", []),
+            iter([result["result"]]),
+            cached=True,
+        )
+
+    def __iter__(self):
+        parts = []
+        for token in self._tokens:
+            if not token:
+                continue
+            if not parts:
+                self.first_token_seconds = time.perf_counter() - self.started
+            parts.append(token)
+            yield token
+        self.total_seconds = time.perf_counter() - self.started
+        self.result = {
+            "query": self.question,
+            "result": "".join(parts),
+            "source_documents": self.source_documents,
+        }
+        if self.cached:
+            self.result["cached"] = True
+        debug_log(
+            f"Answer streamed{' from cache' if self.cached else ''}: first token after "
+            f"{self.first_token_seconds or 0:.2f}s, {len(parts)} tokens in {self.total_seconds:.2f}s"
+        )
+        if self._on_complete is not None and self.result["result"]:
+            self._on_complete(self.result)
+
+
+def stream_qa_chain(chain, question, on_complete=None):
+    """
+    Answers question with a RetrievalQA ("stuff") chain, streaming the LLM output.
+    Retrieval happens before this returns; generation happens while the stream is iterated.
+    """
+    started = time.perf_counter()
+    combine = chain.combine_documents_chain
+    docs = chain.retriever.invoke(question)
+    context = combine.document_separator.join(
+        format_document(doc, combine.document_prompt) for doc in docs
+    )
+    prompt = combine.llm_chain.prompt.format(context=context, question=question)
+    tokens = (chunk.content for chunk in combine.llm_chain.llm.stream(prompt))
+    return AnswerStream(
+        question, docs, tokens, started=started, on_complete=on_complete
+    )
+
+
+def stream_general_answer(llm, question):
+    """
+    Answers question from the LLM's general knowledge, without retrieval, streaming the output.
+    """
+    from fallback import general_knowledge_prompt
+
+    tokens = (chunk.content for chunk in llm.stream(general_knowledge_prompt(question)))
+    return AnswerStream(question, [], tokens, retrieval=False)
@@ -0,0 +1,65 @@
+"""
+Benchmark: Markdown loading throughput (files/sec) of the fast loader vs UnstructuredMarkdownLoader.
+
+Runs both loaders on each directory in config.DOC_DIRECTORIES (docs, docs-api/people,
+docs-confluence) and prints files/sec and the speedup.
+
+Usage:
+    python bench_loading.py
+    python bench_loading.py --loaders fast   # skip the (slow) unstructured loader
+"""
+
+import time
+import argparse
+
+from rag_pipeline import list_markdown_files, load_markdown_files
+from log_utils import output_log
+from config import DOC_DIRECTORIES
+
+
+def time_loader(files, loader):
+    """
+    Loads files with the given loader and returns (seconds, total characters loaded).
+    """
+    start = time.perf_counter()
+    docs = load_markdown_files(files, loader)
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(len(doc.page_content) for doc in docs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Markdown loaders.")
+    parser.add_argument(
+        "--loaders",
+        nargs="+",
+        default=["unstructured", "fast"],
+        choices=["unstructured", "fast"],
+    )
+    parser.add_argument("directories", nargs="*", default=DOC_DIRECTORIES)
+    args = parser.parse_args()
+
+    for directory in args.directories:
+        files = list_markdown_files([directory])
+        if not files:
+            output_log(f"{directory}: no markdown files, skipped")
+            continue
+        rates = {}
+        for loader in args.loaders:
+            try:
+                elapsed, chars = time_loader(files, loader)
+            except ImportError as e:
+                output_log(f"{directory}: {loader} loader unavailable ({e})")
+                continue
+            rates[loader] = len(files) / elapsed if elapsed else float("inf")
+            output_log(
+                f"{directory}: {loader:<12} {len(files)} files in {elapsed:.2f}s "
+                f"= {rates[loader]:.1f} files/sec ({chars} chars)"
+            )
+        if "fast" in rates and "unstructured" in rates:
+            output_log(
+                f"{directory}: fast loader is {rates['fast'] / rates['unstructured']:.1f}x faster"
+            )
+
+
+if __name__ == "__main__":
+    main()
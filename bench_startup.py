@@ -0,0 +1,117 @@
+"""
+Benchmark: startup cost of the chatbot, tracked as a regression metric.
+
+- Import time of main.py (python -X importtime), with the slowest top-level imports
+- Wall-clock time-to-first-prompt of `python main.py` (until "You >" is shown)
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --runs 5 --max-seconds 2.0   # exit 1 if the median is slower
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+from log_utils import output_log
+
+PROMPT_MARKER = "You >"
+
+
+def import_times(module="main"):
+    """
+    Imports module in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (total seconds, list of (cumulative seconds, package) for its direct imports)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "ENV": "production"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+    # Children are printed (indented) before the package that imported them
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:") :].split("|")
+        seconds = int(cumulative) / 1e6
+        depth = (len(package) - len(package.lstrip())) // 2
+        if depth == 0:
+            if package.strip() == module:
+                return seconds, sorted(children, reverse=True)
+            children = []
+        elif depth == 1:
+            children.append((seconds, package.strip()))
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def time_to_first_prompt(script="main.py", timeout=120):
+    """
+    Starts script and returns the seconds until it shows the chat prompt, then exits it.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-u", script],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        env={**os.environ, "ENV": "production"},
+    )
+    output = ""
+    try:
+        while PROMPT_MARKER not in output:
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"{script} showed no prompt within {timeout}s")
+            char = process.stdout.read(1)
+            if not char:
+                raise RuntimeError(f"{script} exited before showing a prompt")
+            output += char
+        elapsed = time.perf_counter() - start
+        process.stdin.write("exit\n")
+        process.stdin.flush()
+        process.wait(timeout=timeout)
+        return elapsed
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chatbot startup time.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to show")
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=None,
+        help="Fail if the median time-to-first-prompt exceeds this",
+    )
+    args = parser.parse_args()
+
+    total, top_level = import_times()
+    output_log(f"import main: {total:.3f}s")
+    for seconds, package in top_level[: args.top]:
+        output_log(f"  {seconds:.3f}s  {package}")
+
+    timings = [time_to_first_prompt() for _ in range(args.runs)]
+    median = statistics.median(timings)
+    output_log(
+        f"Time to first prompt: median {median:.3f}s over {args.runs} runs "
+        f"(min {min(timings):.3f}s, max {max(timings):.3f}s)"
+    )
+    if args.max_seconds is not None and median > args.max_seconds:
+        output_log(f"Startup regression: {median:.3f}s > {args.max_seconds:.3f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Benchmark: the Chroma vector store vs the memory-mapped NumPy vector store (numpy_vectorstore.py).
+
+Each backend runs in a fresh interpreter against the persisted index and reports:
+- Load time: opening the store plus the first query (Chroma loads its HNSW index lazily)
+- Query latency (median and p95) of top-k searches by vector
+- Resident memory (RSS) of the process, and its growth from opening and querying the store
+- Recall of Chroma's approximate HNSW results against the exact NumPy top k
+
+Query vectors are stored chunk embeddings with a little noise, so no embedding calls are made.
+The NumPy export is created first if the index does not have a current one.
+
+Usage:
+    python bench_vectorstore.py
+    python bench_vectorstore.py --queries 500 --k 20
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from log_utils import output_log
+from config import RETRIEVER_K
+
+BACKENDS = ("chroma", "numpy")
+
+
+def rss_mb():
+    """
+    Returns the resident set size of this process in MB.
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    # Peak RSS where /proc is unavailable (KB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_worker(backend, persist_directory, query_file, k):
+    """
+    Opens the backend's store, runs the queries in query_file and prints the results as JSON.
+    """
+    import numpy as np
+
+    if backend == "chroma":
+        from langchain_chroma import Chroma
+    else:
+        from numpy_vectorstore import NumpyVectorStore
+    queries = np.load(query_file)
+    baseline = rss_mb()
+
+    start = time.perf_counter()
+    if backend == "chroma":
+        store = Chroma(persist_directory=persist_directory)
+    else:
+        store = NumpyVectorStore.load(persist_directory)
+    results = [store.similarity_search_by_vector(queries[0].tolist(), k=k)]
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    for query in queries[1:]:
+        start = time.perf_counter()
+        results.append(store.similarity_search_by_vector(query.tolist(), k=k))
+        latencies.append((time.perf_counter() - start) * 1000)
+    rss = rss_mb()
+    print(
+        json.dumps(
+            {
+                "load_seconds": load_seconds,
+                "latencies_ms": latencies,
+                "rss_mb": rss,
+                "rss_growth_mb": rss - baseline,
+                "results": [
+                    [(doc.metadata.get("source"), doc.page_content) for doc in docs]
+                    for docs in results
+                ],
+            }
+        )
+    )
+
+
+def bench_backend(backend, persist_directory, query_file, k):
+    """
+    Runs run_worker for backend in a fresh interpreter and returns its results.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            __file__,
+            "--worker",
+            backend,
+            "--dir",
+            persist_directory,
+            "--query-file",
+            query_file,
+            "--k",
+            str(k),
+        ],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "ENV": "production", "ANONYMIZED_TELEMETRY": "False"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{backend} benchmark failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def sample_queries(persist_directory, count, noise=0.01, seed=0):
+    """
+    Returns count query vectors: random chunk embeddings from the NumPy export plus noise.
+    """
+    import numpy as np
+    from numpy_vectorstore import get_numpy_vectorstore
+
+    store = get_numpy_vectorstore(persist_directory)
+    if store is None or not store.ids:
+        raise RuntimeError(f"No index to benchmark in {persist_directory}")
+    rng = np.random.default_rng(seed)
+    rows = np.asarray(
+        store.vectors[rng.integers(0, len(store.ids), count)], dtype=np.float32
+    )
+    scale = noise * np.abs(rows).mean()
+    return rows + rng.normal(0, scale, rows.shape).astype(np.float32), store
+
+
+def main():
+    from rag_pipeline import CHROMA_DIR
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark Chroma vs NumPy vector stores."
+    )
+    parser.add_argument("--dir", default=CHROMA_DIR, help="Persisted index directory")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=RETRIEVER_K)
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--query-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.dir, args.query_file, args.k)
+        return
+
+    import numpy as np
+
+    queries, store = sample_queries(args.dir, args.queries + 1)
+    output_log(
+        f"Index: {len(store.ids)} chunks x {store.vectors.shape[1]} dimensions "
+        f"({store.vectors.dtype}), {args.queries} queries, k={args.k}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        query_file = os.path.join(tmp, "queries.npy")
+        np.save(query_file, queries)
+        runs = {
+            backend: bench_backend(backend, args.dir, query_file, args.k)
+            for backend in BACKENDS
+        }
+
+    for backend, run in runs.items():
+        latencies = sorted(run["latencies_ms"])
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        output_log(
+            f"{backend:<7} load {run['load_seconds'] * 1000:.0f}ms, "
+            f"query median {statistics.median(latencies):.2f}ms / p95 {p95:.2f}ms, "
+            f"RSS {run['rss_mb']:.0f}MB (+{run['rss_growth_mb']:.0f}MB for the store)"
+        )
+    overlaps = [
+        len(set(map(tuple, approximate)) & set(map(tuple, exact))) / len(exact)
+        for approximate, exact in zip(
+            runs["chroma"]["results"], runs["numpy"]["results"]
+        )
+        if exact
+    ]
+    if overlaps:
+        output_log(
+            f"Chroma recall@{args.k} against the exact NumPy search: "
+            f"{statistics.mean(overlaps):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
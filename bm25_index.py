@@ -0,0 +1,196 @@
+"""
+Local BM25 inverted index over the chunks in the Chroma index.
+
+- Built from the same chunks as the vector index (read back from the Chroma collection,
+  so no chunk is re-loaded or re-embedded) and saved next to it in the persist directory
+- Tied to the index version: a missing or stale index is rebuilt from the collection on
+  first use, so incremental refreshes and older indexes need no extra step
+- Exact-term matches (names, emails, module names like JUMP, acronyms like LWOP or PIP)
+  are what dense embeddings miss; retrievers.HybridRetriever fuses both result lists
+- Supports the Chroma metadata filters the query router produces (see search_utils)
+"""
+
+import os
+import json
+import math
+import time
+import threading
+
+import numpy as np
+
+from log_utils import debug_log, output_log
+from config import BM25_K1, BM25_B
+from search_utils import tokenize, FilterMasks
+
+BM25_FILE = "bm25_index.json"
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunk term frequencies. postings maps a term to (chunk positions, term
+    counts) arrays, so scoring a query is a few vectorized NumPy updates.
+    """
+
+    def __init__(self, ids, lengths, metadatas, postings, index_version=None):
+        self.ids = ids
+        self.lengths = np.asarray(lengths, dtype=np.float32)
+        self.metadatas = metadatas
+        self.postings = {
+            term: (np.asarray(docs, dtype=np.int32), np.asarray(tfs, dtype=np.float32))
+            for term, (docs, tfs) in postings.items()
+        }
+        self.index_version = index_version
+        self.average_length = float(self.lengths.mean()) if len(ids) else 0.0
+        self.masks = FilterMasks(metadatas)
+
+    @classmethod
+    def build(cls, ids, texts, metadatas, index_version=None):
+        postings = {}
+        lengths = []
+        for position, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                docs, tfs = postings.setdefault(token, ([], []))
+                docs.append(position)
+                tfs.append(count)
+        return cls(ids, lengths, metadatas, postings, index_version)
+
+    @classmethod
+    def from_collection(cls, persist_directory, index_version=None, page_size=5000):
+        """
+        Builds the index from the chunks stored in the Chroma collection.
+        """
+        from langchain_chroma import Chroma
+
+        collection = Chroma(persist_directory=persist_directory)._collection
+        ids, texts, metadatas = [], [], []
+        offset = 0
+        while True:
+            page = collection.get(
+                limit=page_size, offset=offset, include=["documents", "metadatas"]
+            )
+            if not page["ids"]:
+                break
+            ids.extend(page["ids"])
+            texts.extend(page["documents"])
+            metadatas.extend(
+                {
+                    key: value
+                    for key, value in (metadata or {}).items()
+                    if key in ("source", "source_type", "space")
+                }
+                for metadata in page["metadatas"]
+            )
+            offset += len(page["ids"])
+        return cls.build(ids, texts, metadatas, index_version)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data["ids"],
+            data["lengths"],
+            data["metadatas"],
+            data["postings"],
+            data.get("index_version"),
+        )
+
+    def save(self, path):
+        """
+        Writes the index atomically as compact JSON.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": 1,
+                    "index_version": self.index_version,
+                    "ids": self.ids,
+                    "lengths": self.lengths.astype(int).tolist(),
+                    "metadatas": self.metadatas,
+                    "postings": {
+                        term: [docs.tolist(), tfs.astype(int).tolist()]
+                        for term, (docs, tfs) in self.postings.items()
+                    },
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, path)
+
+    def search(self, query, n, where=None):
+        """
+        Returns up to n (chunk id, score) pairs for query, best first, among the chunks
+        matching the where filter. Chunks sharing no term with the query are not returned.
+        """
+        if not self.ids:
+            return []
+        count = len(self.ids)
+        scores = np.zeros(count, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            docs, tfs = posting
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (
+                1 - BM25_B + BM25_B * self.lengths[docs] / self.average_length
+            )
+            scores[docs] += idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+        if where:
+            scores[~self.masks.get(where)] = 0
+        hits = np.flatnonzero(scores)
+        if len(hits) > n:
+            hits = hits[np.argpartition(-scores[hits], n)[:n]]
+        hits = hits[np.argsort(-scores[hits])]
+        return [(self.ids[i], float(scores[i])) for i in hits]
+
+
+def build_bm25_index(persist_directory, index_version=None):
+    """
+    Builds the BM25 index for the Chroma collection in persist_directory and saves it there.
+    """
+    started = time.perf_counter()
+    index = BM25Index.from_collection(persist_directory, index_version)
+    index.save(os.path.join(persist_directory, BM25_FILE))
+    output_log(
+        f"BM25 index: {len(index.ids)} chunks, {len(index.postings)} terms "
+        f"in {time.perf_counter() - started:.1f}s."
+    )
+    return index
+
+
+_lock = threading.Lock()
+_indexes = {}
+
+
+def get_bm25_index(persist_directory):
+    """
+    Returns the BM25 index for the current version of the index in persist_directory,
+    loading it from disk or rebuilding it from the collection when missing or stale.
+    Returns None if there is no index manifest yet.
+    """
+    from rag_pipeline import index_version
+
+    version = index_version(persist_directory)
+    if version is None:
+        return None
+    with _lock:
+        index = _indexes.get(persist_directory)
+        if index is not None and index.index_version == version:
+            return index
+        path = os.path.join(persist_directory, BM25_FILE)
+        index = None
+        try:
+            index = BM25Index.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            debug_log(f"Could not read BM25 index {path}: {e}")
+        if index is None or index.index_version != version:
+            index = build_bm25_index(persist_directory, version)
+        _indexes[persist_directory] = index
+        return index
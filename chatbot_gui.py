@@ -19,10 +19,14 @@ Run with: streamlit run chatbot_gui.py
 
 import os
 import json
-import time
 import datetime
 import streamlit as st
-from main import qa_chain, get_llm, OPENAI_API_KEY
+from main import get_app_context
+from config import QUICK_QUESTIONS, SURPRISE_QUESTIONS
+
+# Build the QA chain in the background so the page renders without waiting for it
+app_context = get_app_context()
+app_context.warm_up()
 
 st.set_page_config(
     page_title="Vyaguta AI",
@@ -412,61 +416,15 @@ with input_outer_col2:
     with btns_col1:
         quick_questions = st.selectbox(
             "",
-            [
-                "Quick Questions",
-                "What is Vyaguta?",
-                "Contact person at leapfrog?",
-                "Leapfrog Technology",
-                "Company Calendar",
-                "Lunch and snacks menu",
-                "Speak-up Channels",
-                "Brief all the Employee Benefits Nepal",
-                "Leave types and guidelines Nepal",
-                "JUMP Module",
-                "LWOP",
-                "Fill a worklog",
-                "Employee Morale Survey",
-                "Performance Appraisal Allowances",
-                "Performance Improvement Plan (PIP)",
-                "Team Outing Reimbursement Guidelines",
-                "Promotions in Q3 2025",
-                "Generate your Leapfrog Signature",
-            ],
+            ["Quick Questions"] + QUICK_QUESTIONS,
             key="quick_questions_selectbox",
         )
     with btns_col2:
         send_button = st.button("Send", use_container_width=True, type="primary")
     with btns_col3:
         if st.button("Surprise", use_container_width=True, help="Surprise me!"):
-            surprise_questions = [
-                "How does the onboarding process work?",
-                "What tools do employees use at Leapfrog?",
-                "Who is Purna Bahadur Shrestha? How do i contact him? ",
-                "Explain in detail about the GAP.",
-                "How to make a PR at Vyaguta?",
-                "What are the different modules in Vyaguta?",
-                "Describe in detail about the OKR module in Vyaguta.",
-                "Describe in detail about the Pulse module in Vyaguta.",
-                "Describe in detail about the Attendance module in Vyaguta.",
-                "I want to take a leave, what are the types of leaves and how do i apply for that?",
-                "How to install Vyaguta's Attendance module in my local machine?",
-                "What are the tech tools used in Vyaguta?",
-                "How do I report a bug in Vyaguta in Slack?",
-                "Please provide me a template for requesting a feedback for quarter-end or mid evaluation.",
-                "Describe in brief about the responsibility of a Senior Software Engineer, Development at leapfrog.",
-                "Describe in detail procedure to mentor and train team members.",
-                "How to fill up the worklog at Vyaguta?",
-                "Describe in detail about the GAP.",
-                "What are the Job Description for the role of Software Engineer, Development at leapfrog?",
-                "What are the job description for DevOps Engineer at leapfrog?",
-                "Who is Kailash Raj Bijayananda? How do I contact him?",
-                "What is the process for General Leave Application and Approval Process?",
-                "What are the brand guidelines for leapfrog?",
-                "How can I identify “Meets Expectations” of my team members? Explain in detail.",
-                "How can we practice real-time feedback?",
-            ]
-            st.session_state["surprise_question"] = surprise_questions[
-                len(st.session_state["messages"]) % len(surprise_questions)
+            st.session_state["surprise_question"] = SURPRISE_QUESTIONS[
+                len(st.session_state["messages"]) % len(SURPRISE_QUESTIONS)
             ]
             st.rerun()
     st.markdown("</div>", unsafe_allow_html=True)
@@ -483,6 +441,20 @@ if quick_questions and quick_questions != "Quick Questions":
     st.session_state["reset_quick_questions"] = True
 
 
+def streaming_bubble(text):
+    """Assistant bubble for an answer that is still being streamed"""
+    return f"""
+    <div class='assistant-message'>
+        <div class='avatar assistant-avatar'>
+        <img src='https://avatars.githubusercontent.com/u/169975383?s=200&v=4' alt='Assistant Avatar' class='assistant-avatar-img'/>
+        </div>
+        <div class='assistant-bubble'>
+         {text}
+        </div>
+    </div>
+    """
+
+
 def process_message(user_input, model_option):
     user_message = {
         "role": "user",
@@ -491,68 +463,63 @@ def process_message(user_input, model_option):
     }
     st.session_state["messages"].append(user_message)
 
-    if st.session_state["user_preferences"]["typing_animation"]:
-        with st.empty():
-            st.markdown(
-                """
-            <div class="loading-glow-indicator"></div>
-            <div class='typing-indicator'>
-               <div class='avatar assistant-avatar'>
-                   <img src='https://avatars.githubusercontent.com/u/169975383?s=200&v=4' alt='Assistant Avatar' class='assistant-avatar-img'/>
-               </div>
-               <div class='typing-text-container'>
-                   <span class='typing-text-gradient'>Vyaguta AI is thinking</span>
-                   <span class='typing-dots'>
-                       <span class='dot'></span>
-                       <span class='dot'></span>
-                       <span class='dot'></span>
-                   </span>
-               </div>
-            </div>
-            """,
-                unsafe_allow_html=True,
+    # Curated questions with a precomputed answer are served instantly, without the animation
+    warm = app_context.warm_answer(user_input.strip())
+    placeholder = st.empty()
+    if warm is None and st.session_state["user_preferences"]["typing_animation"]:
+        # Shown until the first token arrives
+        placeholder.markdown(
+            """
+        <div class="loading-glow-indicator"></div>
+        <div class='typing-indicator'>
+           <div class='avatar assistant-avatar'>
+               <img src='https://avatars.githubusercontent.com/u/169975383?s=200&v=4' alt='Assistant Avatar' class='assistant-avatar-img'/>
+           </div>
+           <div class='typing-text-container'>
+               <span class='typing-text-gradient'>Vyaguta AI is thinking</span>
+               <span class='typing-dots'>
+                   <span class='dot'></span>
+                   <span class='dot'></span>
+                   <span class='dot'></span>
+               </span>
+           </div>
+        </div>
+        """,
+            unsafe_allow_html=True,
+        )
+
+    try:
+        response = ""
+        for token in app_context.stream_answer(user_input.strip()):
+            response += token
+            placeholder.markdown(
+                streaming_bubble(response + " ▌"), unsafe_allow_html=True
             )
-            time.sleep(1.5)
-
-        # with st.spinner("\U0001f9e0 Processing your query..."):
-        try:
-            api_key = OPENAI_API_KEY
-            response = get_response(user_input.strip(), api_key, model_option)
-
-            assistant_message = {
-                "role": "assistant",
-                "content": response,
-                "timestamp": datetime.datetime.now().strftime("%H:%M"),
-            }
-            st.session_state["messages"].append(assistant_message)
-
-            st.session_state["message_stats"]["total_messages"] += 2
-            st.session_state["message_stats"]["user_messages"] += 1
-            st.session_state["message_stats"]["assistant_messages"] += 1
-
-        except Exception as e:
-            error_message = {
-                "role": "assistant",
-                "content": f"I apologize, but I'm experiencing technical difficulties. Please try again or contact support if the issue persists. Error: {str(e)}",
-                "timestamp": datetime.datetime.now().strftime("%H:%M"),
-            }
-            st.session_state["messages"].append(error_message)
+
+        assistant_message = {
+            "role": "assistant",
+            "content": response,
+            "timestamp": datetime.datetime.now().strftime("%H:%M"),
+        }
+        st.session_state["messages"].append(assistant_message)
+
+        st.session_state["message_stats"]["total_messages"] += 2
+        st.session_state["message_stats"]["user_messages"] += 1
+        st.session_state["message_stats"]["assistant_messages"] += 1
+
+    except Exception as e:
+        error_message = {
+            "role": "assistant",
+            "content": f"I apologize, but I'm experiencing technical difficulties. Please try again or contact support if the issue persists. Error: {str(e)}",
+            "timestamp": datetime.datetime.now().strftime("%H:%M"),
+        }
+        st.session_state["messages"].append(error_message)
 
     st.session_state["clear_input"] = True
     st.rerun()
 
 
 if (send_button or auto_send) and user_input.strip():
-
-    def get_response(question, api_key, model_name):
-        """Get response from the AI model"""
-        try:
-            llm = get_llm(api_key)
-            result = qa_chain.invoke({"query": question})
-            return result["result"]
-        except Exception as e:
-            return f"I apologize, but I encountered an error: {str(e)}. Please try asking your question in a different way."
-
     process_message(user_input, model_option)
 
 
@@ -564,64 +531,6 @@ def add_message_timestamp(messages):
     return messages
 
 
-if send_button and user_input.strip():
-    user_message = {
-        "role": "user",
-        "content": user_input.strip(),
-        "timestamp": datetime.datetime.now().strftime("%H:%M"),
-    }
-    st.session_state["messages"].append(user_message)
-
-    if st.session_state["user_preferences"]["typing_animation"]:
-        with st.empty():
-            st.markdown(
-                """
-            <div class='typing-indicator'>
-               <div class='avatar assistant-avatar'>
-                   <img src='https://avatars.githubusercontent.com/u/169975383?s=200&v=4' alt='Assistant Avatar' class='assistant-avatar-img'/>
-               </div>
-               <div class='typing-text-container'>
-                   <span class='typing-text-gradient'>Vyaguta AI is thinking</span>
-                   <span class='typing-dots'>
-                       <span class='dot'></span>
-                       <span class='dot'></span>
-                       <span class='dot'></span>
-                   </span>
-               </div>
-            </div>
-            """,
-                unsafe_allow_html=True,
-            )
-            time.sleep(1.5)
-
-    with st.spinner("🧠 Processing your query..."):
-        try:
-            api_key = OPENAI_API_KEY
-            response = get_response(user_input.strip(), api_key, model_option)
-
-            assistant_message = {
-                "role": "assistant",
-                "content": response,
-                "timestamp": datetime.datetime.now().strftime("%H:%M"),
-            }
-            st.session_state["messages"].append(assistant_message)
-
-            st.session_state["message_stats"]["total_messages"] += 2
-            st.session_state["message_stats"]["user_messages"] += 1
-            st.session_state["message_stats"]["assistant_messages"] += 1
-
-        except Exception as e:
-            error_message = {
-                "role": "assistant",
-                "content": f"I apologize, but I'm experiencing technical difficulties. Please try again or contact support if the issue persists. Error: {str(e)}",
-                "timestamp": datetime.datetime.now().strftime("%H:%M"),
-            }
-            st.session_state["messages"].append(error_message)
-
-    st.session_state["clear_input"] = True
-    st.rerun()
-
-
 # Auto-scroll to bottom (simulation)
 if st.session_state["messages"]:
     st.markdown(
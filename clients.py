@@ -0,0 +1,70 @@
+"""
+Process-wide registry of OpenAI clients.
+
+- Chat models are built once per (API key, model, temperature) and reused by the QA chain,
+  the general-knowledge fallback and the GUI
+- One embedding client (wrapped in the document and query embedding caches) is shared by
+  indexing, retrieval and the answer cache
+- Every client sends its requests through the shared keep-alive, rate-limited httpx client
+  (rate_limit.get_http_client), so connection setup and TLS handshakes happen once per
+  connection, not once per request
+"""
+
+import threading
+
+from log_utils import debug_log
+from config import LLM_MODEL, LLM_TEMPERATURE
+
+_lock = threading.Lock()
+_chat_models = {}
+_embeddings = None
+
+
+def get_chat_model(api_key=None, model=LLM_MODEL, temperature=LLM_TEMPERATURE):
+    """
+    Returns the shared ChatOpenAI instance for this configuration, creating it on first use.
+    """
+    key = (api_key, model, temperature)
+    with _lock:
+        if key not in _chat_models:
+            from langchain_openai import ChatOpenAI
+            from rate_limit import openai_client_kwargs
+
+            debug_log(f"Creating chat client for {model}")
+            _chat_models[key] = ChatOpenAI(
+                openai_api_key=api_key,
+                temperature=temperature,
+                model=model,
+                **openai_client_kwargs(),
+            )
+        return _chat_models[key]
+
+
+def get_embeddings():
+    """
+    Returns the shared embedding function, creating it on first use.
+    Document embeddings go through the on-disk embedding cache and query embeddings through
+    the query LRU cache, unless they are disabled in config.
+    """
+    global _embeddings
+    with _lock:
+        if _embeddings is None:
+            from langchain_openai import OpenAIEmbeddings
+            from rate_limit import openai_client_kwargs
+            from config import EMBEDDING_CACHE_ENABLED
+            from embedding_cache import (
+                CachedEmbeddings,
+                EmbeddingCache,
+                get_query_cache,
+            )
+
+            debug_log("Creating embedding client")
+            embeddings = OpenAIEmbeddings(**openai_client_kwargs())
+            cache = EmbeddingCache() if EMBEDDING_CACHE_ENABLED else None
+            query_cache = get_query_cache()
+            if cache is not None or query_cache is not None:
+                embeddings = CachedEmbeddings(
+                    embeddings, cache=cache, query_cache=query_cache
+                )
+            _embeddings = embeddings
+        return _embeddings
@@ -4,16 +4,197 @@ API_PEOPLE_URL = f"{VYAGUTA_BASE_URL}/api/core/users"
 CLIENT_ID = "lms"
 
 # RAG Pipeline batching
+# Chunks are packed into embedding requests by token count (measured with tiktoken)
+# and several requests run concurrently.
 
-BATCH_SIZE = 40  # Lower batch size to keep total tokens per request well below 300,000
+EMBEDDING_BATCH_MAX_TOKENS = 100000  # Keep total tokens per request well below 300,000
+EMBEDDING_BATCH_MAX_ITEMS = 2048  # OpenAI's limit on inputs per embedding request
+EMBEDDING_MAX_WORKERS = 4  # Concurrent embedding requests
+EMBEDDING_TOKEN_ENCODING = "cl100k_base"
+
+# Adaptive (AIMD) rate limiting shared by OpenAI embedding and chat calls
+RATE_LIMIT_ENABLED = True
+RATE_LIMIT_INITIAL_CONCURRENCY = 4
+RATE_LIMIT_MIN_CONCURRENCY = 1
+RATE_LIMIT_MAX_CONCURRENCY = 16
+RATE_LIMIT_MAX_RETRIES = 6  # Retries on 429/503 before the error reaches the caller
+
+# Shared keep-alive connection pool for all OpenAI calls (see clients.py)
+HTTP_MAX_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 120  # Seconds an idle connection is kept open for reuse
+
+# Chat model used for answers and the general-knowledge fallback
+LLM_MODEL = "gpt-4.1-nano"
+LLM_TEMPERATURE = 0.2
+
+# General-knowledge fallback when the RAG answer is unsure (CLI):
+# "sequential" (ask after the RAG answer), "concurrent" (generate it speculatively alongside
+# the RAG answer), "low_score" (speculate only when the best retrieved chunk scores below
+# FALLBACK_SCORE_THRESHOLD, otherwise sequential) or "off"
+FALLBACK_MODE = "sequential"
+# Relevance score of the best matching chunk on the vector store's l2 scale,
+# 1 - squared distance / sqrt(2), i.e. 1 - sqrt(2) * (1 - cosine) for normalized embeddings.
+# 0.6 is a cosine of about 0.72, where ada-002 scores unrelated text; relevant chunks score
+# about 0.7-0.85 (cosine 0.8-0.9). The best score of every query is in the "Adaptive k" debug
+# log: set this between the scores of questions the docs answer and those they do not.
+FALLBACK_SCORE_THRESHOLD = 0.6
+
+# Persistent embedding cache (keyed by embedding model + normalized chunk text hash)
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_PATH = "embedding_cache.sqlite"
+EMBEDDING_CACHE_MAX_MB = 512
+# In-memory LRU of query embeddings (0 disables); optionally persisted to the cache file
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+QUERY_EMBEDDING_CACHE_DISK = True
+
+# Semantic answer cache: reuse an answer when a question's embedding is this similar (cosine)
+# to a cached one and both have the same content words (stopwords dropped, plurals folded).
+# ada-002 scores questions that differ only in an entity ("apply leave in the OKR module" /
+# "... in the Pulse module") above 0.95, so similarity alone would serve the wrong answer;
+# the word check rejects them. The trade-off: paraphrases that use different content words
+# ("vacation" / "leave") miss the cache and cost one LLM call. Entries are invalidated when
+# the index is rebuilt.
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_PATH = "answer_cache.sqlite"
+ANSWER_CACHE_THRESHOLD = 0.95
+ANSWER_CACHE_MAX_ENTRIES = 5000
+
+# Curated questions offered by the Streamlit GUI. Their answers are precomputed at index-build
+# time (warm_answers.py) and served instantly while they match the current index version.
+QUICK_QUESTIONS = [
+    "What is Vyaguta?",
+    "Contact person at leapfrog?",
+    "Leapfrog Technology",
+    "Company Calendar",
+    "Lunch and snacks menu",
+    "Speak-up Channels",
+    "Brief all the Employee Benefits Nepal",
+    "Leave types and guidelines Nepal",
+    "JUMP Module",
+    "LWOP",
+    "Fill a worklog",
+    "Employee Morale Survey",
+    "Performance Appraisal Allowances",
+    "Performance Improvement Plan (PIP)",
+    "Team Outing Reimbursement Guidelines",
+    "Promotions in Q3 2025",
+    "Generate your Leapfrog Signature",
+]
+SURPRISE_QUESTIONS = [
+    "How does the onboarding process work?",
+    "What tools do employees use at Leapfrog?",
+    "Who is Purna Bahadur Shrestha? How do i contact him? ",
+    "Explain in detail about the GAP.",
+    "How to make a PR at Vyaguta?",
+    "What are the different modules in Vyaguta?",
+    "Describe in detail about the OKR module in Vyaguta.",
+    "Describe in detail about the Pulse module in Vyaguta.",
+    "Describe in detail about the Attendance module in Vyaguta.",
+    "I want to take a leave, what are the types of leaves and how do i apply for that?",
+    "How to install Vyaguta's Attendance module in my local machine?",
+    "What are the tech tools used in Vyaguta?",
+    "How do I report a bug in Vyaguta in Slack?",
+    "Please provide me a template for requesting a feedback for quarter-end or mid evaluation.",
+    "Describe in brief about the responsibility of a Senior Software Engineer, Development at leapfrog.",
+    "Describe in detail procedure to mentor and train team members.",
+    "How to fill up the worklog at Vyaguta?",
+    "Describe in detail about the GAP.",
+    "What are the Job Description for the role of Software Engineer, Development at leapfrog?",
+    "What are the job description for DevOps Engineer at leapfrog?",
+    "Who is Kailash Raj Bijayananda? How do I contact him?",
+    "What is the process for General Leave Application and Approval Process?",
+    "What are the brand guidelines for leapfrog?",
+    "How can I identify “Meets Expectations” of my team members? Explain in detail.",
+    "How can we practice real-time feedback?",
+]
+WARM_ANSWERS_ENABLED = True
+WARM_ANSWERS_PATH = "warm_answers.json"
+WARM_ANSWERS_WORKERS = 4  # Curated questions answered concurrently
 
 # RAG Pipeline document directories
 DOC_DIRECTORIES = ["docs", "docs-api/people", "docs-confluence"]
+# Markdown loader: "fast" (process pool + lightweight parser that keeps headings/tables)
+# or "unstructured" (UnstructuredMarkdownLoader, one file at a time)
+MARKDOWN_LOADER = "fast"
+MARKDOWN_LOADER_WORKERS = None  # None = one worker per CPU
 # Directory for people markdown data
 PEOPLE_MD_DIR = "docs-api/people"
+# Directory for Confluence markdown pages (one subfolder per space)
+CONFLUENCE_MD_DIR = "docs-confluence"
+# Exact people lookup index, written next to people.md by fetch_and_store_people_data.
+# People-routed questions are answered from its matching records instead of a vector search.
+PEOPLE_INDEX_ENABLED = True
+PEOPLE_INDEX_FILE = "people_index.json"
+PEOPLE_INDEX_MAX_MATCHES = 10  # Records fed into the prompt for one question
 
 # RAG Pipeline chunking and retrieval
+# Chunker: "markdown" (splits on headings and --- separators, keeps tables and
+# people records whole, adds heading_path metadata) or "recursive" (character-based)
+CHUNKER = "markdown"
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
 MAX_CHARS = 2000
-RETRIEVER_K = 40
+# Markdown chunker: tables and records up to this size are never split
+RECORD_MAX_CHARS = 8000
+
+# Near-duplicate chunk removal at ingestion time (MinHash + LSH)
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.9  # Estimated Jaccard similarity that counts as a duplicate
+DEDUP_SHINGLE_SIZE = 5  # Words per shingle
+DEDUP_NUM_PERM = 64  # MinHash permutations
+RETRIEVER_K = 20  # Was 40 before hybrid retrieval recovered exact-term matches
+
+# Hybrid retrieval: a local BM25 index over the same chunks, fused with the vector hits
+# by reciprocal rank fusion (names, emails, module names and acronyms match exactly)
+HYBRID_ENABLED = True
+HYBRID_CANDIDATES = (
+    30  # Hits taken from each of the vector and BM25 searches before fusion
+)
+HYBRID_RRF_K = 60  # Rank offset in 1 / (HYBRID_RRF_K + rank)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Adaptive k: instead of always sending k chunks, keep those whose vector relevance score
+# is at least ADAPTIVE_K_MIN_SCORE, stopping at the first drop between consecutive
+# scores larger than ADAPTIVE_K_MAX_GAP; never fewer than ADAPTIVE_K_MIN or more than k.
+# Scores use the same l2 scale as FALLBACK_SCORE_THRESHOLD, 1 - sqrt(2) * (1 - cosine):
+# 0.6 is a cosine of about 0.72, the level of unrelated text with ada-002 (0.3 would be a
+# cosine of about 0.5, which ada-002 practically never scores, so the floor never applied).
+# A gap of 0.08 is a cosine drop of about 0.06.
+ADAPTIVE_K_ENABLED = True
+ADAPTIVE_K_MIN = 4
+ADAPTIVE_K_MIN_SCORE = 0.6
+ADAPTIVE_K_MAX_GAP = 0.08
+
+# Context packing before the "stuff" prompt: neighbouring chunks of a file are merged
+# (overlap removed), duplicates dropped and passages packed into CONTEXT_MAX_TOKENS
+CONTEXT_PACKING_ENABLED = True
+CONTEXT_MAX_TOKENS = 6000
+CONTEXT_TOKEN_ENCODING = "o200k_base"  # Encoding of the gpt-4.1 models
+
+# Optional CPU reranking between retrieval and the prompt: RERANK_CANDIDATES chunks are
+# fetched (instead of the adaptive k), rescored, and the best RERANK_TOP_N are kept.
+# RERANKER: "features" (lexical feature scorer, no model) or "cross-encoder" (small
+# sentence-transformers model, needs `pip install sentence-transformers`; the feature
+# scorer is used until it has loaded). Reranking slower than RERANK_BUDGET_MS is bypassed.
+RERANK_ENABLED = False
+RERANKER = "features"
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANK_CANDIDATES = 30
+RERANK_TOP_N = 8
+RERANK_BUDGET_MS = 150
+
+# Vector store that serves queries: "chroma" or "numpy" (exact search over a memory-mapped
+# embedding matrix exported from Chroma after every build, see numpy_vectorstore.py).
+# NUMPY_VECTOR_DTYPE "float16" halves its size on disk and in memory, but converting it
+# back to float32 makes queries several times slower on most CPUs
+VECTOR_STORE_BACKEND = "chroma"
+NUMPY_VECTOR_DTYPE = "float32"
+
+# Query routing: cheap rules plus a local classifier pick the people, docs, Confluence space
+# or no-retrieval path per question, and the search is narrowed with Chroma metadata filters
+ROUTER_ENABLED = True
+ROUTER_MIN_CONFIDENCE = 0.6  # Below this the classifier is ignored (unfiltered search)
+ROUTER_GENERAL_CONFIDENCE = 0.85  # Skipping retrieval needs a more confident prediction
+# Chunks retrieved per route ("all" is the unfiltered search)
+ROUTER_K = {"people": 10, "docs": 15, "confluence": 15, "all": RETRIEVER_K}
@@ -0,0 +1,132 @@
+"""
+Context assembly between retrieval and the "stuff" prompt.
+
+- Merges chunks that are neighbours in the same file (consecutive chunk_index) into one
+  passage, dropping the text they overlap on
+- Drops duplicate passages (e.g. the same section on duplicated pages) and passages
+  already contained in a kept one
+- Keeps retrieval order (a merged passage ranks like its best chunk) and packs passages
+  into a token budget measured with tiktoken, so the prompt stays bounded
+"""
+
+import tiktoken
+from langchain_core.documents import Document
+
+from log_utils import debug_log
+from config import CONTEXT_MAX_TOKENS, CONTEXT_TOKEN_ENCODING, CHUNK_OVERLAP
+
+_encoding = None
+
+
+def get_encoding():
+    global _encoding
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding(CONTEXT_TOKEN_ENCODING)
+    return _encoding
+
+
+def count_tokens(text):
+    """
+    Returns the number of tokens in text for the chat model's encoding.
+    """
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text, max_tokens):
+    """
+    Returns the first max_tokens tokens of text.
+    """
+    encoding = get_encoding()
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def merge_overlap(first, second, max_overlap=2 * CHUNK_OVERLAP, min_overlap=20):
+    """
+    Joins two neighbouring chunks, dropping the longest end of first (at least min_overlap
+    characters) that second starts with.
+    """
+    tail = first[-max_overlap:]
+    for start in range(len(tail) - min_overlap + 1):
+        if second.startswith(tail[start:]):
+            return first + second[len(tail) - start :]
+    return first + "\n\n" + second
+
+
+def _key(text):
+    return " ".join(text.split()).lower()
+
+
+def merge_neighbours(docs):
+    """
+    Returns (rank, Document) passages: runs of consecutive chunks from the same source are
+    merged into one passage ranked by its best chunk. Chunks without a chunk_index
+    (e.g. people index records) are kept as they are.
+    """
+    runs = {}
+    passages = []
+    for rank, doc in enumerate(docs):
+        index = doc.metadata.get("chunk_index")
+        if index is None:
+            passages.append((rank, doc))
+        else:
+            runs.setdefault(doc.metadata.get("source"), []).append((index, rank, doc))
+    for chunks in runs.values():
+        chunks.sort(key=lambda chunk: chunk[0])
+        run = [chunks[0]]
+        for chunk in chunks[1:] + [None]:
+            if chunk is not None and chunk[0] == run[-1][0] + 1:
+                run.append(chunk)
+                continue
+            text = run[0][2].page_content
+            for _, _, doc in run[1:]:
+                text = merge_overlap(text, doc.page_content)
+            metadata = dict(run[0][2].metadata)
+            if len(run) > 1:
+                metadata["chunk_end"] = run[-1][0]
+            passages.append(
+                (
+                    min(rank for _, rank, _ in run),
+                    Document(page_content=text, metadata=metadata),
+                )
+            )
+            run = [chunk]
+    passages.sort(key=lambda passage: passage[0])
+    return passages
+
+
+def pack_context(docs, max_tokens=CONTEXT_MAX_TOKENS):
+    """
+    Merges, deduplicates and packs retrieved chunks (most relevant first) into at most
+    max_tokens tokens. Passages that do not fit are skipped in favour of later, smaller
+    ones; a first passage larger than the whole budget is truncated.
+
+    Returns:
+        list: Documents to put into the prompt, most relevant first.
+    """
+    passages = merge_neighbours(docs)
+    kept, kept_keys = [], []
+    used = duplicates = over_budget = 0
+    for _, doc in passages:
+        key = _key(doc.page_content)
+        if any(key in other for other in kept_keys):
+            duplicates += 1
+            continue
+        tokens = count_tokens(doc.page_content)
+        if used + tokens > max_tokens:
+            if kept:
+                over_budget += 1
+                continue
+            doc = Document(
+                page_content=truncate_tokens(doc.page_content, max_tokens),
+                metadata=doc.metadata,
+            )
+            tokens = max_tokens
+        kept.append(doc)
+        kept_keys.append(key)
+        used += tokens
+    debug_log(
+        f"Context packed: {len(docs)} chunks -> {len(kept)} passages, {used} tokens "
+        f"({len(docs) - len(passages)} merged, {duplicates} duplicates, "
+        f"{over_budget} over the {max_tokens}-token budget)"
+    )
+    return kept
@@ -0,0 +1,198 @@
+"""
+Near-duplicate chunk detection for the RAG pipeline.
+
+- MinHash signatures over word shingles, indexed with LSH banding
+- Streams chunks and drops those whose estimated Jaccard similarity to an
+  already kept chunk is at or above a threshold (exact duplicates are dropped too)
+- Records which file's kept chunk each dropped chunk duplicated, so an incremental refresh
+  can re-ingest the files whose content only survived in a file that changed or was removed
+- Can be seeded with the chunks already indexed, so incremental refreshes dedup against them
+- Reports how many chunks, bytes and tokens were saved
+"""
+
+import re
+import hashlib
+
+import numpy as np
+
+from log_utils import output_log
+from config import DEDUP_THRESHOLD, DEDUP_SHINGLE_SIZE, DEDUP_NUM_PERM
+
+_WORD_RE = re.compile(r"\w+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _hash32(value):
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "big"
+    )
+
+
+def shingles(text, size=DEDUP_SHINGLE_SIZE):
+    """
+    Returns the set of hashed word shingles (lowercased, punctuation ignored) of text.
+    """
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {_hash32(" ".join(words))} if words else set()
+    return {
+        _hash32(" ".join(words[i : i + size])) for i in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures with num_perm universal hash functions (fixed seeds),
+    vectorized over all shingles of a chunk with NumPy.
+    """
+
+    def __init__(self, num_perm=DEDUP_NUM_PERM, seed=1):
+        rng = _SplitMix(seed)
+        # a, b < 2**32 and 32-bit shingle hashes keep a * x + b within uint64
+        self.a = np.array(
+            [rng.next() % _MAX_HASH + 1 for _ in range(num_perm)], dtype=np.uint64
+        )
+        self.b = np.array(
+            [rng.next() % _MAX_HASH for _ in range(num_perm)], dtype=np.uint64
+        )
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return tuple([_MAX_HASH] * len(self.a))
+        x = np.fromiter(shingle_set, dtype=np.uint64, count=len(shingle_set))
+        hashed = (np.outer(x, self.a) + self.b) % np.uint64(_MERSENNE_PRIME)
+        hashed &= np.uint64(_MAX_HASH)
+        return tuple(hashed.min(axis=0).tolist())
+
+
+class _SplitMix:
+    """
+    Tiny deterministic PRNG, so signatures are stable across runs and Python versions.
+    """
+
+    def __init__(self, seed):
+        self.state = seed
+
+    def next(self):
+        self.state = (self.state + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        return z ^ (z >> 31)
+
+
+def _lsh_bands(threshold, num_perm):
+    """
+    Picks the (bands, rows) split whose LSH S-curve threshold (1/b)^(1/r) is closest
+    to the similarity threshold.
+    """
+    best = (1, num_perm)
+    best_error = float("inf")
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateFilter:
+    """
+    Streaming near-duplicate filter. Keeps the first chunk of every group of near-duplicates.
+    duplicates maps each source file to the sources of the kept chunks its dropped chunks
+    duplicated.
+    """
+
+    def __init__(
+        self,
+        threshold=DEDUP_THRESHOLD,
+        shingle_size=DEDUP_SHINGLE_SIZE,
+        num_perm=DEDUP_NUM_PERM,
+    ):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = _lsh_bands(threshold, num_perm)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = []
+        self.owners = []
+        self.exact = {}
+        self.duplicates = {}
+        self.kept = 0
+        self.dropped = 0
+        self.bytes_saved = 0
+        self.tokens_saved = 0
+
+    def duplicate_of(self, text, owner=""):
+        """
+        Returns the owner (source file) of the kept chunk text duplicates, or None after
+        recording text as a kept chunk of owner.
+        """
+        normalized = " ".join(_WORD_RE.findall(text.lower()))
+        exact_key = hashlib.sha1(normalized.encode("utf-8")).digest()
+        if exact_key in self.exact:
+            return self.exact[exact_key]
+        signature = self.hasher.signature(shingles(text, self.shingle_size))
+        candidates = set()
+        for band, bucket in enumerate(self.buckets):
+            key = signature[band * self.rows : (band + 1) * self.rows]
+            candidates.update(bucket.get(key, ()))
+        for candidate in candidates:
+            other = self.signatures[candidate]
+            similarity = sum(x == y for x, y in zip(signature, other)) / len(signature)
+            if similarity >= self.threshold:
+                return self.owners[candidate]
+        index = len(self.signatures)
+        self.signatures.append(signature)
+        self.owners.append(owner)
+        self.exact[exact_key] = owner
+        for band, bucket in enumerate(self.buckets):
+            key = signature[band * self.rows : (band + 1) * self.rows]
+            bucket.setdefault(key, []).append(index)
+        return None
+
+    def seed(self, chunks):
+        """
+        Records already indexed (text, source) chunks as kept, so new chunks are checked
+        against them too.
+        """
+        for text, source in chunks:
+            self.duplicate_of(text, source)
+
+    def filter(self, chunks):
+        """
+        Yields the chunks that are not near-duplicates of an earlier chunk.
+        """
+        from embedding_batcher import count_tokens
+
+        for chunk in chunks:
+            source = chunk.metadata.get("source", "")
+            owner = self.duplicate_of(chunk.page_content, source)
+            if owner is not None:
+                if owner != source:
+                    self.duplicates.setdefault(source, set()).add(owner)
+                self.dropped += 1
+                self.bytes_saved += len(chunk.page_content.encode("utf-8"))
+                self.tokens_saved += count_tokens(chunk.page_content)
+                continue
+            self.kept += 1
+            yield chunk
+
+    def report(self):
+        """
+        Logs how many chunks were dropped and the bytes and tokens that were not embedded.
+        """
+        total = self.kept + self.dropped
+        output_log(
+            f"Dedup (threshold {self.threshold}): dropped {self.dropped} of {total} chunks, "
+            f"saved {self.bytes_saved} bytes and {self.tokens_saved} tokens."
+        )
+        return {
+            "kept": self.kept,
+            "dropped": self.dropped,
+            "bytes_saved": self.bytes_saved,
+            "tokens_saved": self.tokens_saved,
+        }
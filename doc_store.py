@@ -0,0 +1,168 @@
+"""
+Streaming, append-only document store for the RAG pipeline.
+
+- Documents are stored one per line as JSON (page_content + metadata) in a .jsonl file
+- A sidecar offset index maps each source path to the byte ranges of its documents
+- Supports streaming iteration, random access by source path and partial loading,
+  so corpora larger than RAM can be chunked while they are read
+"""
+
+import os
+import json
+
+from langchain_core.documents import Document
+
+
+def index_path_for(path):
+    """
+    Returns the path of the offset index that belongs to a document store file.
+    """
+    return path + ".idx.json"
+
+
+class DocStoreWriter:
+    """
+    Appends documents to a new store. The store only replaces an existing one on close(),
+    so readers never see a half-written file. meta (JSON-serializable) is saved in the
+    offset index, e.g. to record which file versions the documents were loaded from.
+    """
+
+    def __init__(self, path, meta=None):
+        self.path = path
+        self.meta = meta
+        self._tmp_path = path + ".tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._offsets = {}
+        self.count = 0
+
+    def add(self, doc):
+        line = json.dumps(
+            {"page_content": doc.page_content, "metadata": doc.metadata},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        offset = self._file.tell()
+        self._file.write(line + b"\n")
+        source = doc.metadata.get("source", "")
+        self._offsets.setdefault(source, []).append([offset, len(line)])
+        self.count += 1
+
+    def add_all(self, docs):
+        for doc in docs:
+            self.add(doc)
+
+    def passthrough(self, docs):
+        """
+        Yields docs unchanged while writing each one to the store, so a stream can be
+        stored and processed in a single pass.
+        """
+        for doc in docs:
+            self.add(doc)
+            yield doc
+
+    def close(self):
+        self._file.close()
+        index_path = index_path_for(self.path)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": 1,
+                    "count": self.count,
+                    "sources": self._offsets,
+                    "meta": self.meta,
+                },
+                f,
+            )
+        os.replace(self._tmp_path, self.path)
+        os.replace(index_path + ".tmp", index_path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class DocStore:
+    """
+    Read access to a document store written by DocStoreWriter.
+    Iterating a DocStore streams its Document objects in insertion order.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._index = None
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(path) and os.path.exists(index_path_for(path))
+
+    @classmethod
+    def write(cls, docs, path):
+        """
+        Writes an iterable of Documents to a new store at path and returns it.
+        Documents are streamed to disk, so the iterable can be a generator.
+        """
+        with DocStoreWriter(path) as writer:
+            writer.add_all(docs)
+        return cls(path)
+
+    @property
+    def index(self):
+        if self._index is None:
+            with open(index_path_for(self.path), "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        return self._index
+
+    @property
+    def meta(self):
+        return self.index.get("meta")
+
+    def __len__(self):
+        return self.index["count"]
+
+    def __iter__(self):
+        return self.iter_docs()
+
+    def sources(self):
+        """
+        Returns the source paths stored in the store.
+        """
+        return list(self.index["sources"])
+
+    def iter_docs(self, sources=None):
+        """
+        Streams Documents. If sources is given, only documents from those source paths are read.
+        """
+        if sources is None:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    yield _decode(line)
+            return
+        ranges = sorted(
+            tuple(entry)
+            for source in sources
+            for entry in self.index["sources"].get(source, [])
+        )
+        with open(self.path, "rb") as f:
+            for offset, length in ranges:
+                f.seek(offset)
+                yield _decode(f.read(length))
+
+    def get(self, source):
+        """
+        Returns the Documents stored for one source path (empty list if unknown).
+        """
+        return list(self.iter_docs([source]))
+
+
+def _decode(line):
+    record = json.loads(line)
+    return Document(page_content=record["page_content"], metadata=record["metadata"])
@@ -0,0 +1,154 @@
+"""
+Token-aware, concurrent embedding batcher for the RAG pipeline.
+
+- Packs chunks into batches up to a token budget measured with tiktoken
+- Embeds several batches concurrently through a bounded thread pool
+- Writes embedded batches to Chroma in their original order
+- Skips batches already committed by an interrupted run (see ingest_checkpoint)
+- Reports ingestion throughput (chunks/sec and tokens/sec)
+"""
+
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import tiktoken
+
+from ingest_checkpoint import fingerprint
+from log_utils import debug_log, output_log
+from config import (
+    EMBEDDING_BATCH_MAX_TOKENS,
+    EMBEDDING_BATCH_MAX_ITEMS,
+    EMBEDDING_MAX_WORKERS,
+    EMBEDDING_TOKEN_ENCODING,
+)
+
+_encoding = None
+
+
+def count_tokens(text):
+    """
+    Returns the number of tokens in text for the embedding model's encoding.
+    """
+    global _encoding
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding(EMBEDDING_TOKEN_ENCODING)
+    return len(_encoding.encode(text, disallowed_special=()))
+
+
+def pack_batches(
+    chunks,
+    ids=None,
+    max_tokens=EMBEDDING_BATCH_MAX_TOKENS,
+    max_items=EMBEDDING_BATCH_MAX_ITEMS,
+):
+    """
+    Groups chunks into batches that stay within max_tokens and max_items per request.
+
+    chunks and ids may be generators; they are consumed lazily and in lockstep.
+
+    Yields:
+        list: Batches of (chunk_id, chunk, token_count) tuples, in input order.
+    """
+    ids = iter(ids) if ids is not None else None
+    batch = []
+    batch_tokens = 0
+    for chunk in chunks:
+        chunk_id = next(ids) if ids is not None else str(uuid.uuid4())
+        tokens = count_tokens(chunk.page_content)
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append((chunk_id, chunk, tokens))
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def batch_key(batch):
+    """
+    Returns the checkpoint key of a batch, derived from its chunk IDs.
+    """
+    return fingerprint([chunk_id for chunk_id, _, _ in batch])
+
+
+def _write_batch(vectorstore, batch, vectors):
+    vectorstore._collection.upsert(
+        ids=[chunk_id for chunk_id, _, _ in batch],
+        embeddings=vectors,
+        documents=[chunk.page_content for _, chunk, _ in batch],
+        metadatas=[chunk.metadata or None for _, chunk, _ in batch],
+    )
+
+
+def embed_and_store(
+    chunks,
+    vectorstore,
+    embeddings,
+    ids=None,
+    max_tokens=EMBEDDING_BATCH_MAX_TOKENS,
+    max_items=EMBEDDING_BATCH_MAX_ITEMS,
+    max_workers=EMBEDDING_MAX_WORKERS,
+    checkpoint=None,
+):
+    """
+    Embeds chunks concurrently in token-packed batches and writes them to the vector store in order.
+    At most 2 * max_workers batches are in flight, so memory stays bounded for large corpora.
+    If a checkpoint is given, batches it has already committed are skipped and every written
+    batch is committed to it.
+
+    Returns:
+        dict: Throughput stats (chunks, tokens, batches, seconds, chunks_per_sec, tokens_per_sec).
+    """
+    start = time.perf_counter()
+    total_chunks = 0
+    total_tokens = 0
+    total_batches = 0
+    skipped_batches = 0
+    pending = []
+
+    def flush_oldest():
+        nonlocal total_chunks, total_tokens, total_batches
+        batch, future = pending.pop(0)
+        # Futures are awaited in submission order, so writes land in input order
+        _write_batch(vectorstore, batch, future.result())
+        if checkpoint is not None:
+            checkpoint.commit(batch_key(batch))
+        total_chunks += len(batch)
+        total_tokens += sum(tokens for _, _, tokens in batch)
+        total_batches += 1
+        debug_log(
+            f"Stored batch {total_batches} ({len(batch)} chunks, {total_chunks} total)"
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch in pack_batches(chunks, ids, max_tokens, max_items):
+            if checkpoint is not None and checkpoint.is_committed(batch_key(batch)):
+                skipped_batches += 1
+                continue
+            texts = [chunk.page_content for _, chunk, _ in batch]
+            pending.append((batch, executor.submit(embeddings.embed_documents, texts)))
+            if len(pending) >= 2 * max_workers:
+                flush_oldest()
+        while pending:
+            flush_oldest()
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "chunks": total_chunks,
+        "tokens": total_tokens,
+        "batches": total_batches,
+        "skipped_batches": skipped_batches,
+        "seconds": elapsed,
+        "chunks_per_sec": total_chunks / elapsed if elapsed else 0.0,
+        "tokens_per_sec": total_tokens / elapsed if elapsed else 0.0,
+    }
+    output_log(
+        f"Embedded {total_chunks} chunks ({total_tokens} tokens) in {total_batches} batches "
+        f"in {elapsed:.1f}s: {stats['chunks_per_sec']:.1f} chunks/sec, "
+        f"{stats['tokens_per_sec']:.0f} tokens/sec."
+    )
+    if skipped_batches:
+        output_log(f"Skipped {skipped_batches} batches committed by a previous run.")
+    return stats
@@ -0,0 +1,347 @@
+"""
+Persistent, content-addressed embedding cache for the RAG pipeline.
+
+- Stores embeddings in SQLite keyed by (embedding model, hash of normalized chunk text)
+- Vectors are stored as packed float32 blobs
+- Size-based eviction of least recently used entries
+- Hit/miss counters so rebuilds only pay for text that has never been embedded
+- In-memory LRU cache of query embeddings (optionally backed by the same SQLite file),
+  so repeated questions skip the embedding round trip
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.embeddings import Embeddings
+
+from log_utils import debug_log
+from config import (
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_MB,
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_DISK,
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """
+    Normalizes text before hashing so trivially different chunks share one cache entry.
+    """
+    text = unicodedata.normalize("NFC", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def cache_key(model, text):
+    """
+    Returns the cache key for a text embedded with the given model.
+    """
+    payload = f"{model}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def embedding_model_name(embeddings):
+    """
+    Returns the model name of an embeddings client, used to namespace cache entries.
+    """
+    return getattr(embeddings, "model", None) or type(embeddings).__name__
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding store with LRU eviction once the cache exceeds max_bytes.
+    Safe to share between threads. The size is tracked as a running total (read once when the
+    cache opens), so inserts do not scan the table; it is recounted only before evicting.
+    """
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._size()
+
+    def _size(self):
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def get_many(self, model, texts):
+        """
+        Looks up embeddings for texts. Returns a list aligned with texts, with None for misses.
+        """
+        keys = [cache_key(model, text) for text in texts]
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement
+            for i in range(0, len(keys), 500):
+                part = keys[i : i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    part,
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+            results = []
+            for key in keys:
+                blob = found.get(key)
+                if blob is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    results.append(array("f", blob).tolist())
+        return results
+
+    def put_many(self, model, texts, vectors):
+        """
+        Stores embeddings for texts and evicts old entries if the cache is over its size limit.
+        """
+        now = time.time()
+        rows = [
+            (cache_key(model, text), model, array("f", vector).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            # Replaced entries no longer count towards the size
+            keys = [row[0] for row in rows]
+            for i in range(0, len(keys), 500):
+                part = keys[i : i + 500]
+                placeholders = ",".join("?" * len(part))
+                self._total_bytes -= self._conn.execute(
+                    f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings "
+                    f"WHERE key IN ({placeholders})",
+                    part,
+                ).fetchone()[0]
+            self._total_bytes += sum(len(row[2]) for row in rows)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._evict()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Other connections to the same file may have written or evicted meanwhile
+        total = self._total_bytes = self._size()
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% of the limit so we do not evict on every insert
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_used ASC"
+        ).fetchall():
+            if total <= target:
+                break
+            self._conn.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._conn.commit()
+        self._total_bytes = total
+        debug_log(f"Embedding cache evicted {evicted} entries ({total} bytes remain)")
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the current size of the cache.
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class QueryEmbeddingCache:
+    """
+    LRU cache of query embeddings keyed by (model, normalized question text).
+    Holds up to max_entries vectors in memory; misses fall through to an optional disk
+    layer (an EmbeddingCache) before the embedding model is called. New embeddings are written
+    to disk by a background thread, so a miss does not wait for SQLite. Safe to share between
+    threads.
+    """
+
+    def __init__(self, max_entries=QUERY_EMBEDDING_CACHE_SIZE, disk=None):
+        self.max_entries = max_entries
+        self.disk = disk
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writer = None
+
+    def _write_to_disk(self, model, text, vector):
+        with self._lock:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="query-cache"
+                )
+        self._writer.submit(self._put, model, text, vector)
+
+    def _put(self, model, text, vector):
+        try:
+            self.disk.put_many(model, [text], [vector])
+        except Exception as e:
+            debug_log(f"Query embedding cache write failed: {e}")
+
+    def flush(self):
+        """
+        Waits until the queued disk writes have finished.
+        """
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+    def get_or_embed(self, model, text, embed):
+        """
+        Returns the embedding of text, calling embed(text) only on a cache miss.
+        """
+        # Query and document embeddings may differ, so queries get their own namespace
+        model = f"{model}#query"
+        key = cache_key(model, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                self._log("memory")
+                return vector
+        vector = self.disk.get_many(model, [text])[0] if self.disk else None
+        if vector is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._log("disk")
+        else:
+            vector = embed(text)
+            if self.disk:
+                self._write_to_disk(model, text, vector)
+            with self._lock:
+                self.misses += 1
+                self._log("miss")
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return vector
+
+    def _log(self, outcome):
+        stats = self._stats()
+        debug_log(
+            f"Query embedding cache {outcome}: {stats['hit_rate']:.0%} hit rate over "
+            f"{stats['lookups']} queries ({stats['memory_hits']} memory, {stats['disk_hits']} disk)"
+        )
+
+    def _stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "lookups": lookups,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def stats(self):
+        """
+        Returns memory/disk hit and miss counters, the hit rate and the number of entries held.
+        """
+        with self._lock:
+            return self._stats()
+
+
+def get_query_cache():
+    """
+    Returns a QueryEmbeddingCache configured from config, or None if it is disabled.
+    """
+    if not QUERY_EMBEDDING_CACHE_SIZE:
+        return None
+    disk = EmbeddingCache() if QUERY_EMBEDDING_CACHE_DISK else None
+    return QueryEmbeddingCache(QUERY_EMBEDDING_CACHE_SIZE, disk=disk)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings client so document embeddings are served from an EmbeddingCache
+    and query embeddings from a QueryEmbeddingCache; only cache misses are sent to the
+    underlying model. Either cache may be None to disable it.
+    """
+
+    def __init__(self, embeddings, cache=None, model=None, query_cache=None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.query_cache = query_cache
+        self.model = model or embedding_model_name(embeddings)
+
+    def embed_documents(self, texts):
+        if self.cache is None:
+            return self.embeddings.embed_documents(texts)
+        texts = list(texts)
+        vectors = self.cache.get_many(self.model, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            new_vectors = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put_many(self.model, [texts[i] for i in missing], new_vectors)
+            for i, vector in zip(missing, new_vectors):
+                vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text):
+        if self.query_cache is None:
+            return self.embeddings.embed_query(text)
+        return self.query_cache.get_or_embed(
+            self.model, text, self.embeddings.embed_query
+        )
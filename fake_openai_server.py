@@ -0,0 +1,214 @@
+"""
+Local fake OpenAI-compatible server for exercising rate limiting without spending quota.
+
+Serves /v1/embeddings and /v1/chat/completions with deterministic responses and enforces a
+requests-per-minute quota, answering 429 with retry-after and x-ratelimit-* headers like OpenAI.
+Chat completions requested with "stream": true are sent word by word as server-sent events.
+
+Usage:
+    python fake_openai_server.py --port 8099 --rpm 600
+    OPENAI_BASE_URL=http://localhost:8099/v1 OPENAI_API_KEY=fake python rebuild_rag_pipeline.py
+"""
+
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from log_utils import output_log
+
+
+class QuotaWindow:
+    """
+    Sliding one-minute window of request timestamps.
+    """
+
+    def __init__(self, rpm):
+        self.rpm = rpm
+        self.timestamps = []
+        self.served = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """
+        Returns (allowed, remaining, seconds_until_reset).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.timestamps = [t for t in self.timestamps if now - t < 60]
+            reset = 60 - (now - self.timestamps[0]) if self.timestamps else 0.0
+            if len(self.timestamps) >= self.rpm:
+                self.rejected += 1
+                return False, 0, reset
+            self.timestamps.append(now)
+            self.served += 1
+            return True, self.rpm - len(self.timestamps), reset
+
+
+def fake_embedding(text, dimensions):
+    """
+    Deterministic unit-scale pseudo-embedding derived from the text hash.
+    """
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    return [(seed[i % len(seed)] - 128) / 128.0 for i in range(dimensions)]
+
+
+def make_handler(quota, latency, dimensions):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive like the real API, so connection reuse can be observed
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_stream(self, content, model, headers):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            # No Content-Length: the stream ends when the connection closes
+            self.send_header("Connection", "close")
+            self.close_connection = True
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            words = content.split(" ")
+            for i, word in enumerate(words):
+                delta = {"content": word if i == 0 else " " + word}
+                if i == 0:
+                    delta["role"] = "assistant"
+                self._send_event(model, delta, None)
+                time.sleep(latency / len(words))
+            self._send_event(model, {}, "stop")
+            self.wfile.write(b"data: [DONE]\n\n")
+
+        def _send_event(self, model, delta, finish_reason):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            allowed, remaining, reset = quota.try_acquire()
+            headers = {
+                "x-ratelimit-limit-requests": str(quota.rpm),
+                "x-ratelimit-remaining-requests": str(remaining),
+                "x-ratelimit-reset-requests": f"{reset:.3f}s",
+            }
+            if not allowed:
+                headers["retry-after-ms"] = str(int(reset * 1000) + 1)
+                self._send_json(
+                    429,
+                    {"error": {"message": "Rate limit reached", "type": "requests"}},
+                    headers,
+                )
+                return
+            time.sleep(latency)
+            if self.path.endswith("/embeddings"):
+                inputs = request.get("input", [])
+                if isinstance(inputs, str):
+                    inputs = [inputs]
+                data = [
+                    {
+                        "object": "embedding",
+                        "index": i,
+                        "embedding": fake_embedding(str(text), dimensions),
+                    }
+                    for i, text in enumerate(inputs)
+                ]
+                payload = {
+                    "object": "list",
+                    "data": data,
+                    "model": request.get("model", "fake-embedding"),
+                    "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                }
+            elif self.path.endswith("/chat/completions"):
+                question = request.get("messages", [{}])[-1].get("content", "")
+                content = f"Fake answer ({len(question)} prompt chars)."
+                if request.get("stream"):
+                    self._send_stream(
+                        content, request.get("model", "fake-chat"), headers
+                    )
+                    return
+                payload = {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake-chat"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": content,
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 0,
+                        "completion_tokens": 0,
+                        "total_tokens": 0,
+                    },
+                }
+            else:
+                self._send_json(404, {"error": {"message": "Not found"}})
+                return
+            self._send_json(200, payload, headers)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument(
+        "--rpm", type=int, default=600, help="Requests per minute quota"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Seconds per request"
+    )
+    parser.add_argument("--dimensions", type=int, default=1536)
+    args = parser.parse_args()
+
+    quota = QuotaWindow(args.rpm)
+    server = ThreadingHTTPServer(
+        (args.host, args.port), make_handler(quota, args.latency, args.dimensions)
+    )
+    output_log(
+        f"Fake OpenAI server on http://{args.host}:{args.port}/v1 ({args.rpm} rpm)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        output_log(
+            f"Served {quota.served} requests, rejected {quota.rejected} with 429"
+        )
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
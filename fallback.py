@@ -0,0 +1,111 @@
+"""
+General-knowledge fallback for questions the documentation cannot answer.
+
+- Detects "unsure" RAG answers
+- Answers from the LLM's general knowledge, either after the RAG answer (sequential) or
+  speculatively in a background thread while the RAG answer is still being generated
+- A speculative fallback that turns out not to be needed is cancelled: its token stream
+  is closed, which stops generation on the server
+"""
+
+import time
+import threading
+
+from log_utils import debug_log
+
+UNSURE_PHRASES = [
+    "I'm not sure about that based on the current information",
+    "I am not sure",
+    "I don't know",
+    "cannot find the answer",
+    "refer to the official",
+    "recommend visiting the official",
+]
+# Printed between an unsure RAG answer and the general-knowledge answer that follows it
+GENERAL_ANSWER_HEADER = (
+    "\n\n---\nGeneral knowledge answer (not from the Vyaguta documentation):\n"
+)
+
+
+def is_unsure(answer):
+    """
+    True if an answer says the assistant does not know.
+    """
+    return any(phrase in answer for phrase in UNSURE_PHRASES)
+
+
+def general_knowledge_prompt(question):
+    return f"""
+You are a helpful AI assistant. Answer the following question with a concise, accurate, and non-hallucinated response. If the question is about a basic or general software engineering or IT concept, provide a clear, general definition. If the question is outside of common software/IT knowledge, say 'I'm not sure.'
+
+Question: {question}
+Answer:
+"""
+
+
+def _content(message):
+    # Ensure answer is a string (handle AIMessage or other types)
+    return message.content if hasattr(message, "content") else str(message)
+
+
+def general_answer(llm, question):
+    """
+    Returns the general-knowledge answer to question, or None if the LLM is unsure or fails.
+    """
+    try:
+        answer = _content(llm.invoke(general_knowledge_prompt(question)))
+    except Exception as e:
+        debug_log(f"General-knowledge fallback failed: {e}")
+        return None
+    return answer if answer and not is_unsure(answer) else None
+
+
+class SpeculativeFallback:
+    """
+    Generates the general-knowledge answer in a background thread.
+    result() waits for it; cancel() stops generation when the RAG answer is good enough.
+    """
+
+    def __init__(self, llm, question):
+        self.question = question
+        self.answer = None
+        self.started = time.perf_counter()
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(llm,), name="speculative-fallback", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, llm):
+        stream = llm.stream(general_knowledge_prompt(self.question))
+        parts = []
+        try:
+            for chunk in stream:
+                if self._cancelled.is_set():
+                    debug_log(
+                        f"Speculative fallback cancelled after "
+                        f"{time.perf_counter() - self.started:.2f}s"
+                    )
+                    return
+                parts.append(_content(chunk))
+            answer = "".join(parts)
+            self.answer = answer if answer and not is_unsure(answer) else None
+        except Exception as e:
+            debug_log(f"Speculative fallback failed: {e}")
+        finally:
+            stream.close()
+            self._done.set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def result(self, timeout=None):
+        """
+        Waits for the fallback answer; returns None if the LLM was unsure or failed.
+        """
+        self._done.wait(timeout)
+        debug_log(
+            f"Speculative fallback ready {time.perf_counter() - self.started:.2f}s after start"
+        )
+        return self.answer
@@ -8,7 +8,7 @@ from config import API_PEOPLE_URL
 from auth import app_startup
 from log_utils import debug_log, output_log
 from config import PEOPLE_MD_DIR
-
+from people_index import build_people_index
 
 load_dotenv()
 
@@ -106,6 +106,9 @@ def save_people_to_markdown(people, out_dir, consolidated_file="people.md"):
         f.write(consolidated_md)
     output_log(f"Saved consolidated people.md with {len(people)} people to {out_dir}")
 
+    # Exact lookup index (names, emails, departments, designations) for people questions
+    build_people_index(out_dir)
+
 
 def main():
 
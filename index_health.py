@@ -0,0 +1,88 @@
+"""
+Local health check for the persisted Chroma index.
+
+- Validates the index without any network calls (no embedding or probe query)
+- Checks the build finished, the collection is non-empty, its size matches the manifest,
+  its chunk metadata is current and its embedding dimensions match the ones recorded at
+  build time
+"""
+
+import os
+
+from langchain_chroma import Chroma
+
+from log_utils import debug_log
+from ingest_checkpoint import is_index_complete
+
+
+def collection_stats(persist_directory):
+    """
+    Returns (count, dimensions) of the Chroma collection, reading only the local DB.
+    dimensions is None when the collection is empty.
+    """
+    collection = Chroma(persist_directory=persist_directory)._collection
+    count = collection.count()
+    dimensions = None
+    if count:
+        embeddings = collection.get(limit=1, include=["embeddings"])["embeddings"]
+        if embeddings is not None and len(embeddings):
+            dimensions = len(embeddings[0])
+    return count, dimensions
+
+
+def check_index_health(persist_directory, manifest, chunk_metadata=None):
+    """
+    Validates the Chroma index in persist_directory against its manifest.
+    chunk_metadata is the chunk metadata version the index must have been built with.
+
+    Returns:
+        dict: healthy (bool), count, dimensions and a list of problems found
+    """
+    health = {"healthy": False, "count": 0, "dimensions": None, "problems": []}
+    problems = health["problems"]
+    if not os.path.isdir(persist_directory):
+        problems.append("index directory is missing")
+        return health
+    if not is_index_complete(persist_directory):
+        problems.append("index build did not complete")
+    if manifest is None:
+        problems.append("index manifest is missing")
+
+    try:
+        health["count"], health["dimensions"] = collection_stats(persist_directory)
+    except Exception as e:
+        problems.append(f"collection could not be read: {e}")
+        return health
+    if health["count"] == 0:
+        problems.append("collection is empty")
+
+    if manifest is not None:
+        expected = sum(
+            len(entry.get("chunk_ids", []))
+            for entry in manifest.get("files", {}).values()
+        )
+        if health["count"] != expected:
+            problems.append(
+                f"collection has {health['count']} chunks, manifest lists {expected}"
+            )
+        if (
+            chunk_metadata is not None
+            and manifest.get("chunk_metadata") != chunk_metadata
+        ):
+            problems.append(
+                f"chunk metadata is version {manifest.get('chunk_metadata')}, "
+                f"expected {chunk_metadata}"
+            )
+        recorded = manifest.get("embedding_dimensions")
+        if recorded and health["dimensions"] and recorded != health["dimensions"]:
+            problems.append(
+                f"embeddings have {health['dimensions']} dimensions, "
+                f"manifest records {recorded}"
+            )
+
+    health["healthy"] = not problems
+    debug_log(
+        f"Index health: {health['count']} chunks, {health['dimensions']} dimensions, "
+        f"problems: {problems or 'none'}"
+    )
+    return health
@@ -0,0 +1,122 @@
+"""
+Checkpointing for resumable ingestion into the Chroma vector store.
+
+- Records which embedding batches have been committed to Chroma
+- Lets a rerun skip committed batches and resume at the first uncommitted one
+- Marks the index complete only once every batch is committed
+"""
+
+import os
+import json
+import hashlib
+
+from log_utils import debug_log
+
+CHECKPOINT_FILE = "ingest_checkpoint.json"
+
+
+def fingerprint(ids):
+    """
+    Returns a short hash identifying an ordered list of chunk IDs (an ingestion plan or a batch).
+    """
+    digest = hashlib.sha1()
+    for chunk_id in ids:
+        digest.update(chunk_id.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IngestCheckpoint:
+    """
+    Ingestion state stored as JSON next to the Chroma DB.
+
+    status is "in_progress" while batches are being written and "complete" once the build
+    finished. A missing file means the index predates checkpointing and is treated as complete.
+    """
+
+    def __init__(self, persist_directory):
+        self.path = os.path.join(persist_directory, CHECKPOINT_FILE)
+        self.state = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            debug_log(f"Could not read ingest checkpoint {self.path}: {e}")
+            return {"status": "in_progress", "plan": None, "committed": []}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def mode(self):
+        return (self.state or {}).get("mode", "full")
+
+    @property
+    def plan(self):
+        return (self.state or {}).get("plan")
+
+    def in_progress(self):
+        """
+        True if an ingestion was started and never marked complete.
+        """
+        return self.state is not None and self.state.get("status") != "complete"
+
+    def begin(self, plan, mode="full"):
+        """
+        Starts (or resumes) ingestion of a plan. Committed batches are kept only when the
+        interrupted run was ingesting the same plan.
+
+        Returns:
+            int: Number of already committed batches that will be skipped.
+        """
+        if self.in_progress() and self.state.get("plan") == plan:
+            committed = len(self.state.get("committed", []))
+            debug_log(f"Resuming ingestion with {committed} committed batches")
+            return committed
+        self.state = {
+            "status": "in_progress",
+            "plan": plan,
+            "mode": mode,
+            "committed": [],
+        }
+        self._committed = set()
+        self._save()
+        return 0
+
+    def is_committed(self, batch_key):
+        if not hasattr(self, "_committed"):
+            self._committed = set((self.state or {}).get("committed", []))
+        return batch_key in self._committed
+
+    def commit(self, batch_key):
+        """
+        Records a batch as durably written to Chroma.
+        """
+        if self.is_committed(batch_key):
+            return
+        self._committed.add(batch_key)
+        self.state["committed"].append(batch_key)
+        self._save()
+
+    def complete(self):
+        """
+        Marks the index complete. Call only after every batch is committed.
+        """
+        self.state = {"status": "complete", "mode": self.mode}
+        self._committed = set()
+        self._save()
+
+
+def is_index_complete(persist_directory):
+    """
+    Returns False if the Chroma DB in persist_directory holds a partially written build.
+    """
+    return not IngestCheckpoint(persist_directory).in_progress()
@@ -13,26 +13,25 @@ All major functions and classes are documented with docstrings for clarity and m
 
 import os
 import time
+import threading
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
-from auth import app_startup
-from rag_pipeline import setup_rag_pipeline
 from log_utils import debug_log, output_log
-from config import DOC_DIRECTORIES
-
-
-# --- Authenticate and refresh Vyaguta access token at startup ---
-debug_log("Starting authentication (app_startup)")
-app_startup()
-debug_log("Authentication complete")
-
-# --- Setup RAG pipeline with Chroma retriever ---
-debug_log("Setting up RAG pipeline")
-
-retriever = setup_rag_pipeline(DOC_DIRECTORIES, force_rebuild=False)
-debug_log("RAG pipeline setup complete")
+from config import (
+    DOC_DIRECTORIES,
+    ANSWER_CACHE_ENABLED,
+    WARM_ANSWERS_ENABLED,
+    ROUTER_ENABLED,
+    FALLBACK_MODE,
+    FALLBACK_SCORE_THRESHOLD,
+    LLM_MODEL,
+)
+
+# Heavy modules (langchain, chromadb, openai) are imported on first use, not at import time,
+# so importing this module (Streamlit workers, watch_main.py restarts, tools that only need
+# get_llm) stays cheap. See AppContext below.
+if TYPE_CHECKING:
+    from langchain.prompts import PromptTemplate
 
 
 def load_api_key() -> str:
@@ -49,14 +48,13 @@ def load_api_key() -> str:
     return key
 
 
-OPENAI_API_KEY = load_api_key()
-
-
-def get_prompt_template() -> PromptTemplate:
+def get_prompt_template() -> "PromptTemplate":
     """
     Returns a prompt template for the onboarding assistant, instructing the LLM to quote or summarize exact steps, rules, or lists from the markdown context.
     If there are multiple people with the same name, list all of them with their details. For multiple matches, start your answer with a phrase like: "There are X people named Y:" and then list each one. For a single match, answer as usual.
     """
+    from langchain.prompts import PromptTemplate
+
     return PromptTemplate(
         template="""
 You are Vyaguta's assistant. Use the provided context to answer user questions about Vyaguta's modules, features, onboarding procedures, tools, policies, coding guidelines, and any information available about Vyaguta and Leapfrog.
@@ -98,25 +96,19 @@ Answer:
     )
 
 
-prompt = get_prompt_template()
-
-
 def get_llm(api_key: str):
     """
-    Initializes the OpenAI LLM for chat.
+    Returns the OpenAI chat LLM. The instance (and its pooled HTTP connections) is shared
+    process-wide, so calling this per request is cheap.
 
     Args:
         api_key (str): OpenAI API key.
     Returns:
         ChatOpenAI: The LLM instance.
     """
-    debug_log("Initializing LLM")
-    llm = ChatOpenAI(openai_api_key=api_key, temperature=0.2, model="gpt-4.1-nano")
-    debug_log("LLM initialized")
-    return llm
+    from clients import get_chat_model
 
-
-llm = get_llm(OPENAI_API_KEY)
+    return get_chat_model(api_key)
 
 
 def build_qa_chain(llm, retriever, prompt):
@@ -130,6 +122,8 @@ def build_qa_chain(llm, retriever, prompt):
     Returns:
         RetrievalQA: The QA chain for answering questions.
     """
+    from langchain.chains import RetrievalQA
+
     debug_log("Building QA chain")
     chain = RetrievalQA.from_chain_type(
         llm=llm,
@@ -142,15 +136,262 @@ def build_qa_chain(llm, retriever, prompt):
     return chain
 
 
-qa_chain = build_qa_chain(llm, retriever, prompt)
+class AppContext:
+    """
+    Lazily initialized application state.
+
+    The retriever, LLM and QA chain (behind the semantic answer cache unless it is disabled)
+    are built on first access (thread-safe, once per process) instead of at import time.
+    warm_up() builds them in the background so the first question does not pay for it
+    while the user is still typing.
+    """
+
+    def __init__(self, directories=None):
+        self.directories = directories or DOC_DIRECTORIES
+        self._lock = threading.RLock()
+        self._values = {}
+        self._authenticated = False
+        self._warm_up_started = False
+        # Separate lock, so warm answers are served while the QA chain is still being built
+        self._warm_lock = threading.Lock()
+        self._warm_answers = None
+        self._warm_namespace = None
+
+    def _get(self, name, build):
+        with self._lock:
+            if name not in self._values:
+                started = time.perf_counter()
+                self._values[name] = build()
+                debug_log(f"Initialized {name} in {time.perf_counter() - started:.2f}s")
+            return self._values[name]
+
+    def _build_retriever(self):
+        from rag_pipeline import setup_rag_pipeline
+
+        return setup_rag_pipeline(self.directories, force_rebuild=False)
+
+    def _build_qa_chain(self):
+        chain = build_qa_chain(self.llm, self.retriever, self.prompt)
+        if not ANSWER_CACHE_ENABLED:
+            return chain
+        from answer_cache import CachedQAChain, answer_cache_namespace
+        from rag_pipeline import get_embeddings, index_version
+
+        skip = None
+        if ROUTER_ENABLED:
+            from query_router import route_query
+
+            def skip(question):
+                # Questions about different people can embed almost identically
+                return route_query(question).name == "people"
+
+        return CachedQAChain(
+            chain,
+            get_embeddings().embed_query,
+            index_version,
+            answer_cache_namespace(self.llm, self.prompt),
+            skip=skip,
+        )
+
+    @property
+    def api_key(self):
+        return self._get("api_key", load_api_key)
+
+    @property
+    def retriever(self):
+        return self._get("retriever", self._build_retriever)
+
+    @property
+    def prompt(self):
+        return self._get("prompt", get_prompt_template)
+
+    @property
+    def llm(self):
+        return self._get("llm", lambda: get_llm(self.api_key))
+
+    @property
+    def qa_chain(self):
+        return self._get("qa_chain", self._build_qa_chain)
+
+    def authenticate(self):
+        """
+        Refreshes the Vyaguta access token once per process.
+        """
+        if self._authenticated:
+            return
+        self._authenticated = True
+        from auth import app_startup
+
+        debug_log("Starting authentication (app_startup)")
+        app_startup()
+        debug_log("Authentication complete")
+
+    def _get_warm_answers(self):
+        with self._warm_lock:
+            if self._warm_answers is None:
+                from warm_answers import WarmAnswers
+
+                self._warm_answers = WarmAnswers.load()
+            return self._warm_answers
+
+    def _get_warm_namespace(self):
+        # From config rather than self.llm, so it does not wait for the QA chain to be built
+        with self._warm_lock:
+            if self._warm_namespace is None:
+                from answer_cache import model_namespace
+
+                self._warm_namespace = model_namespace(LLM_MODEL, get_prompt_template())
+            return self._warm_namespace
+
+    def warm_answer(self, question):
+        """
+        Returns the precomputed QA result for a curated question if it matches the current
+        index version, LLM model and prompt, else None.
+        """
+        if not WARM_ANSWERS_ENABLED:
+            return None
+        from rag_pipeline import index_version
+
+        return self._get_warm_answers().get(
+            question, index_version(), self._get_warm_namespace()
+        )
+
+    def refresh_warm_answers(self, force=False):
+        """
+        Recomputes the warm answers if they were built for another index version, LLM model or
+        prompt (or always, if force is True).
+        """
+        from answer_cache import answer_cache_namespace
+        from rag_pipeline import index_version
+        from warm_answers import build_warm_answers
+
+        warm = self._get_warm_answers()
+        version = index_version()
+        namespace = answer_cache_namespace(self.llm, self.prompt)
+        if version is None or (not force and warm.is_current(version, namespace)):
+            return warm
+        output_log("Refreshing warm answers for the curated questions...")
+        warm = build_warm_answers(self.qa_chain, version, namespace)
+        with self._warm_lock:
+            self._warm_answers = warm
+        return warm
+
+    def stream_answer(self, question):
+        """
+        Returns an AnswerStream for question: tokens are yielded as the LLM generates them and
+        stream.result holds the answer and source documents once it is exhausted. Warm and
+        cached answers are yielded in one piece; questions the query router sends down the
+        no-retrieval path are answered from general knowledge.
+        """
+        from answer_stream import AnswerStream, stream_qa_chain, stream_general_answer
+
+        warm = self.warm_answer(question)
+        if warm is not None:
+            return AnswerStream.from_result(warm)
+        if ROUTER_ENABLED:
+            from query_router import route_query
+
+            if not route_query(question).retrieve:
+                return stream_general_answer(self.llm, question)
+        chain = self.qa_chain
+        if hasattr(chain, "stream_answer"):
+            return chain.stream_answer(question)
+        return stream_qa_chain(chain, question)
+
+    def top_relevance_score(self, question):
+        """
+        Returns the relevance score (0-1) of the best matching chunk for question, or None.
+        Cheap: the query embedding is cached and the search is local.
+        """
+        from rag_pipeline import open_vectorstore
+
+        vectorstore = self._get("vectorstore", open_vectorstore)
+        try:
+            results = vectorstore.similarity_search_with_relevance_scores(question, k=1)
+        except Exception as e:
+            debug_log(f"Relevance score lookup failed: {e}")
+            return None
+        return results[0][1] if results else None
+
+    def start_fallback(self, question):
+        """
+        Starts the general-knowledge fallback speculatively when FALLBACK_MODE asks for it
+        ("concurrent", or "low_score" with a weak best match). Returns a SpeculativeFallback or None.
+        """
+        if FALLBACK_MODE == "low_score":
+            score = self.top_relevance_score(question)
+            debug_log(f"Best retrieval relevance score: {score}")
+            if score is None or score >= FALLBACK_SCORE_THRESHOLD:
+                return None
+        elif FALLBACK_MODE != "concurrent":
+            return None
+        from fallback import SpeculativeFallback
+
+        return SpeculativeFallback(self.llm, question)
+
+    def warm_up(self):
+        """
+        Authenticates, builds the QA chain and refreshes stale warm answers in a background
+        thread. Callers that access qa_chain before it is ready simply wait for it.
+        Only the first call starts the thread (Streamlit calls this on every rerun).
+        """
+        with self._lock:
+            if self._warm_up_started:
+                return
+            self._warm_up_started = True
+
+        def run():
+            try:
+                self.authenticate()
+                self.qa_chain
+                if WARM_ANSWERS_ENABLED:
+                    self.refresh_warm_answers()
+            except Exception as e:
+                debug_log(f"Background warm-up failed: {e}")
+
+        threading.Thread(target=run, name="app-warm-up", daemon=True).start()
+
+
+_app_context = None
+_app_context_lock = threading.Lock()
+
+
+def get_app_context() -> AppContext:
+    """
+    Returns the process-wide AppContext, creating it on first call.
+    """
+    global _app_context
+    with _app_context_lock:
+        if _app_context is None:
+            _app_context = AppContext()
+        return _app_context
+
+
+# Module attributes that used to be built at import time, now resolved lazily
+_LAZY_ATTRIBUTES = {
+    "OPENAI_API_KEY": "api_key",
+    "retriever": "retriever",
+    "prompt": "prompt",
+    "llm": "llm",
+    "qa_chain": "qa_chain",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(get_app_context(), _LAZY_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main():
     """
     Runs the Vyaguta Assistant Chatbot in a terminal chat loop.
     """
+    from fallback import is_unsure, general_answer, GENERAL_ANSWER_HEADER
+
     debug_log("Entering main chat loop")
-    import sys
+    context = get_app_context()
+    context.warm_up()
 
     try:
         from colorama import init, Fore, Style
@@ -184,60 +425,69 @@ def main():
         debug_log(f"User input: {question}")
         if question.strip().lower() == "exit":
             break
-        debug_log("Invoking QA chain")
-        result = qa_chain.invoke({"query": question})
-        debug_log("QA chain invocation complete")
+        answer_header = (
+            color_text("\nAssistant:", Fore.MAGENTA + Style.BRIGHT)
+            if COLORAMA
+            else "\nAssistant:"
+        )
+        print(answer_header)
+        debug_log("Streaming answer")
+        # "concurrent" speculates while retrieval runs; "low_score" needs the score first
+        fallback = (
+            context.start_fallback(question) if FALLBACK_MODE == "concurrent" else None
+        )
+        stream = context.stream_answer(question)
+        if stream.cached or not stream.retrieval:
+            # Cached and general-knowledge answers do not need a speculative fallback
+            if fallback is not None:
+                fallback.cancel()
+                fallback = None
+        elif fallback is None:
+            fallback = context.start_fallback(question)
+        for token in stream:
+            print(
+                color_text(token, Fore.YELLOW) if COLORAMA else token,
+                end="",
+                flush=True,
+            )
+        print()
+        debug_log(
+            f"Answer complete, time to first token {stream.first_token_seconds or 0:.2f}s"
+        )
+        result = stream.result
         answer = result["result"]
-        unsure_phrases = [
-            "I'm not sure about that based on the current information",
-            "I am not sure",
-            "I don't know",
-            "cannot find the answer",
-            "refer to the official",
-            "recommend visiting the official",
-        ]
+        # The streamed answer is already on screen, so unlike before streaming the
+        # general-knowledge fallback cannot replace it: it is printed below it, labelled
+        addendum = ""
 
         # ---
         # RAG-ONLY MODE (restrict to documentation):
-        # Uncomment the following block to restrict answers to documentation only (no AI fallback):
-        # if any(phrase in answer for phrase in unsure_phrases):
-        #     context = result.get("context", "")
-        #     if context:
-        #         answer += (
-        #             "\n\n---\nMost relevant documentation section:\n" + context.strip()
-        #         )
+        # Set FALLBACK_MODE = "off" in config.py to restrict answers to documentation only.
 
         # ---
         # RAG + AI FALLBACK MODE (default):
-        if any(phrase in answer for phrase in unsure_phrases):
+        if is_unsure(answer):
             # Show the most relevant context chunk verbatim for transparency
-            context = result.get("context", "")
-            if context:
-                answer += (
-                    "\n\n---\nMost relevant documentation section:\n" + context.strip()
+            context_text = result.get("context", "")
+            if context_text:
+                if fallback is not None:
+                    fallback.cancel()
+                addendum += (
+                    "\n\n---\nMost relevant documentation section:\n"
+                    + context_text.strip()
                 )
             # If still unsure, use LLM general knowledge as fallback for basic/general questions
-            else:
-                # Use a direct LLM call for general knowledge fallback
-                general_prompt = f"""
-You are a helpful AI assistant. Answer the following question with a concise, accurate, and non-hallucinated response. If the question is about a basic or general software engineering or IT concept, provide a clear, general definition. If the question is outside of common software/IT knowledge, say 'I'm not sure.'
-
-Question: {question}
-Answer:
-"""
-                general_llm = get_llm(OPENAI_API_KEY)
-                try:
-                    general_answer = general_llm.invoke(general_prompt)
-                    if general_answer and not any(
-                        phrase in general_answer for phrase in unsure_phrases
-                    ):
-                        # Ensure answer is a string (handle AIMessage or other types)
-                        if hasattr(general_answer, "content"):
-                            answer = general_answer.content
-                        else:
-                            answer = str(general_answer)
-                except Exception:
-                    pass
+            elif fallback is not None:
+                general = fallback.result()
+                if general:
+                    addendum += GENERAL_ANSWER_HEADER + general
+            elif FALLBACK_MODE != "off" and stream.retrieval:
+                general = general_answer(context.llm, question)
+                if general:
+                    addendum += GENERAL_ANSWER_HEADER + general
+        elif fallback is not None:
+            # The documentation answered it: stop the speculative generation
+            fallback.cancel()
 
         # ---
         # Show sources for every answer (with debug info)
@@ -255,19 +505,16 @@ Answer:
         if env != "production":
             if sources:
                 sources_str = ", ".join(sorted(sources))
-                answer += f"\n\n[SOURCE: {sources_str}]"
+                addendum += f"\n\n[SOURCE: {sources_str}]"
             else:
-                answer += "\n\n[SOURCE: Unknown]"
-
-        answer_header = (
-            color_text("\nAssistant:", Fore.MAGENTA + Style.BRIGHT)
-            if COLORAMA
-            else "\nAssistant:"
-        )
-        answer_body = color_text(answer, Fore.YELLOW) if COLORAMA else answer
-        debug_log("Answer ready, printing to user")
-        print(answer_header)
-        print(answer_body)
+                addendum += "\n\n[SOURCE: Unknown]"
+
+        if addendum:
+            print(
+                color_text(addendum.lstrip("\n"), Fore.YELLOW)
+                if COLORAMA
+                else addendum.lstrip("\n")
+            )
 
     if not COLORAMA:
         print(
@@ -0,0 +1,278 @@
+"""
+Markdown-structure-aware chunker for the RAG pipeline.
+
+- Splits documents on markdown headings and `---` separators
+- Never splits a table or a single record section (e.g. one person in people.md)
+  unless it exceeds RECORD_MAX_CHARS
+- Fenced code blocks are opaque: a `# comment` inside one is code, not a heading
+- Merges small sibling sections up to chunk_size so chunks stay self-contained but not tiny
+- Each chunk carries its heading path (e.g. "Leave Policy > Nepal > Sick Leave") as metadata
+"""
+
+import re
+
+from langchain_core.documents import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from config import CHUNK_SIZE, CHUNK_OVERLAP, MAX_CHARS, RECORD_MAX_CHARS
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*\S)\s*$")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+_RULE_RE = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$")
+_LIST_ITEM_RE = re.compile(r"^\s*([-*+]|\d+[.)])\s+")
+
+HEADING_PATH_SEPARATOR = " > "
+
+
+def iter_blocks(text):
+    """
+    Splits text into (kind, content) blocks: "heading", "rule", "table", "code" or "text".
+    For headings, content is (level, title). A code block runs from its opening fence to
+    the matching closing fence, blank lines and `#` lines included.
+    """
+    lines = []
+    kind = None
+    fence = None  # Marker of the open code fence
+
+    def flush():
+        nonlocal lines, kind
+        block = (kind, "\n".join(lines)) if lines else None
+        lines = []
+        kind = None
+        return block
+
+    for line in text.splitlines():
+        marker = _FENCE_RE.match(line)
+        if fence is not None:
+            lines.append(line.rstrip())
+            if marker and marker.group(1) == fence:
+                fence = None
+                yield flush()
+            continue
+        if marker:
+            block = flush()
+            if block:
+                yield block
+            fence = marker.group(1)
+            kind = "code"
+            lines.append(line.rstrip())
+            continue
+        stripped = line.strip()
+        heading = _HEADING_RE.match(line)
+        is_table = stripped.startswith("|")
+        if (
+            not stripped
+            or heading
+            or _RULE_RE.match(line)
+            or (kind == "table") != is_table
+        ):
+            block = flush()
+            if block:
+                yield block
+        if not stripped:
+            continue
+        if heading:
+            yield "heading", (len(heading.group(1)), heading.group(2))
+        elif _RULE_RE.match(line):
+            yield "rule", "---"
+        else:
+            kind = "table" if is_table else "text"
+            lines.append(line.rstrip())
+    block = flush()
+    if block:
+        yield block
+
+
+def iter_sections(text):
+    """
+    Groups blocks into sections delimited by headings and `---` separators.
+
+    Yields:
+        dict: {"path": [heading titles], "blocks": [(kind, text)], "after_rule": bool}
+    """
+    path = []
+    section = {"path": [], "blocks": [], "after_rule": False}
+    for kind, content in iter_blocks(text):
+        if kind in ("heading", "rule"):
+            if section["blocks"]:
+                yield section
+            if kind == "heading":
+                level, title = content
+                path = [(lvl, t) for lvl, t in path if lvl < level] + [(level, title)]
+                section = {
+                    "path": [t for _, t in path],
+                    "blocks": [("heading", "#" * level + " " + title)],
+                    "after_rule": section["after_rule"] and not section["blocks"],
+                }
+            else:
+                section = {
+                    "path": [t for _, t in path],
+                    "blocks": [],
+                    "after_rule": True,
+                }
+            continue
+        section["blocks"].append((kind, content))
+    if section["blocks"]:
+        yield section
+
+
+def _section_text(blocks):
+    return "\n\n".join(content for _, content in blocks)
+
+
+def _is_record(blocks):
+    """
+    True for sections that are a single record: an optional heading followed only by list items
+    (the shape of each person in people.md).
+    """
+    body = [(kind, content) for kind, content in blocks if kind != "heading"]
+    if not body:
+        return False
+    return all(
+        kind == "text"
+        and all(_LIST_ITEM_RE.match(line) for line in content.splitlines())
+        for kind, content in body
+    )
+
+
+def _split_table(table, max_chars):
+    """
+    Splits an oversized table between rows, repeating its header row in every piece.
+    """
+    rows = table.splitlines()
+    header, body = rows[0], rows[1:]
+    pieces = []
+    current = [header]
+    for row in body:
+        if len(current) > 1 and len("\n".join(current + [row])) > max_chars:
+            pieces.append("\n".join(current))
+            current = [header]
+        current.append(row)
+    pieces.append("\n".join(current))
+    return pieces
+
+
+def split_section(section, chunk_size, chunk_overlap, max_chars):
+    """
+    Returns the text pieces for one section. Sections up to max_chars (or records and tables up
+    to RECORD_MAX_CHARS) stay whole; larger ones are packed block by block up to chunk_size, and
+    continuation pieces are prefixed with the heading path so they remain self-contained.
+    """
+    blocks = section["blocks"]
+    text = _section_text(blocks)
+    if len(text) <= max_chars:
+        return [text]
+    if _is_record(blocks) and len(text) <= RECORD_MAX_CHARS:
+        return [text]
+
+    prefix = HEADING_PATH_SEPARATOR.join(section["path"])
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    units = []
+    for kind, content in blocks:
+        if len(content) <= max_chars or (
+            kind == "table" and len(content) <= RECORD_MAX_CHARS
+        ):
+            units.append((kind, content))
+        elif kind == "table":
+            budget = max_chars - len(prefix) - 2
+            units.extend(("table", piece) for piece in _split_table(content, budget))
+        else:
+            units.extend(("text", piece) for piece in text_splitter.split_text(content))
+
+    pieces = []
+    current = []
+    has_body = False
+    for kind, content in units:
+        # Headings stay attached to the content that follows them
+        if has_body and len("\n\n".join(current + [content])) > chunk_size:
+            pieces.append("\n\n".join(current))
+            current = [prefix] if prefix else []
+            has_body = False
+        current.append(content)
+        has_body = has_body or kind != "heading"
+    if current:
+        pieces.append("\n\n".join(current))
+    return pieces
+
+
+def _common_path(a, b):
+    common = []
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        common.append(x)
+    return common
+
+
+def iter_markdown_chunks(
+    docs, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, max_chars=MAX_CHARS
+):
+    """
+    Lazily chunks documents along their markdown structure.
+
+    Small adjacent sections under the same top-level heading are merged up to chunk_size,
+    but never across a `---` separator.
+
+    Yields:
+        Document: Chunks with the document's metadata plus "heading_path".
+    """
+    for doc in docs:
+        pending = None  # (path, text) waiting to be merged with the next section
+
+        def emit(path, text):
+            metadata = dict(doc.metadata)
+            metadata["heading_path"] = HEADING_PATH_SEPARATOR.join(path)
+            return Document(page_content=text, metadata=metadata)
+
+        for section in iter_sections(doc.page_content):
+            pieces = split_section(section, chunk_size, chunk_overlap, max_chars)
+            path = section["path"]
+            if len(pieces) == 1 and pending is not None:
+                pending_path, pending_text = pending
+                same_parent = pending_path[:1] == path[:1]
+                merged = pending_text + "\n\n" + pieces[0]
+                if (
+                    same_parent
+                    and not section["after_rule"]
+                    and len(merged) <= chunk_size
+                ):
+                    pending = (_common_path(pending_path, path), merged)
+                    continue
+            if pending is not None:
+                yield emit(*pending)
+                pending = None
+            for piece in pieces[:-1]:
+                yield emit(path, piece)
+            pending = (path, pieces[-1])
+        if pending is not None:
+            yield emit(*pending)
+
+
+def check_code_blocks():
+    """
+    Regression check: comments in a fenced code block must not become headings.
+    """
+    from markdown_loader import markdown_to_text
+
+    markdown = (
+        "# Attendance Module\n\n## Local setup\n\n```bash\n# Install dependencies\n"
+        "yarn install\n\n# Copy the env file\ncp .env.example .env\n```\n\n"
+        "Then start the app with yarn start.\n"
+    )
+    doc = Document(page_content=markdown_to_text(markdown), metadata={})
+    chunks = list(iter_markdown_chunks([doc]))
+    paths = [chunk.metadata["heading_path"] for chunk in chunks]
+    assert all(path.startswith("Attendance Module") for path in paths), paths
+    assert not any("Install" in path or "env file" in path for path in paths), paths
+    setup = [
+        chunk.page_content for chunk in chunks if "yarn install" in chunk.page_content
+    ]
+    assert len(setup) == 1 and "# Copy the env file" in setup[0], setup
+    assert "yarn start" in setup[0], setup
+
+
+if __name__ == "__main__":
+    check_code_blocks()
+    print("markdown_chunker: code block check passed")
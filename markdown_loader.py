@@ -0,0 +1,145 @@
+"""
+Fast Markdown loader for the RAG pipeline.
+
+- Lightweight markdown-to-text conversion (standard library only, no unstructured/nltk)
+- Keeps headings, tables, lists, `---` separators and code fences so document structure
+  survives (a `# comment` inside a code block stays distinguishable from a heading)
+- Reads files in parallel with a process pool
+- Produces the same Document objects (with source metadata) as UnstructuredMarkdownLoader
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from config import MARKDOWN_LOADER_WORKERS
+
+# Bump when markdown_to_text output changes, so stored documents are reloaded
+FAST_LOADER_VERSION = 2
+
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+_HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+_SETEXT_RE = re.compile(r"^\s{0,3}(=+|-+)\s*$")
+_RULE_RE = re.compile(r"^\s{0,3}([-*_])(\s*\1){2,}\s*$")
+_TABLE_SEPARATOR_RE = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?\s*$")
+_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)\s]+)[^)]*\)")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_EMPHASIS_RE = re.compile(r"(\*\*|\*|~~)(?=\S)(.+?)(?<=\S)\1")
+_UNDERSCORE_EMPHASIS_RE = re.compile(r"(?<!\w)(__|_)(?=\S)(.+?)(?<=\S)\1(?!\w)")
+_INLINE_CODE_RE = re.compile(r"`([^`]+)`")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# Small file sets are faster to load in-process than through a pool
+_MIN_FILES_FOR_POOL = 16
+
+
+def _inline_to_text(line):
+    line = _IMAGE_RE.sub(r"\1", line)
+    line = _LINK_RE.sub(
+        lambda m: (
+            m.group(1) if m.group(1) == m.group(2) else f"{m.group(1)} ({m.group(2)})"
+        ),
+        line,
+    )
+    line = _HTML_TAG_RE.sub("", line)
+    line = _INLINE_CODE_RE.sub(r"\1", line)
+    line = _EMPHASIS_RE.sub(r"\2", line)
+    line = _UNDERSCORE_EMPHASIS_RE.sub(r"\2", line)
+    return line.rstrip()
+
+
+def markdown_to_text(markdown):
+    """
+    Converts Markdown to plain text while keeping its structure.
+
+    Headings stay as `#` lines, table rows keep their `|` cells (separator rows are dropped),
+    horizontal rules are normalised to `---`, and inline formatting, links, images and HTML
+    tags are reduced to their text. Fenced code blocks are kept verbatim with their fences.
+    """
+    lines = []
+    fence = None  # Marker of the open code fence
+    for raw_line in markdown.splitlines():
+        marker = _FENCE_RE.match(raw_line)
+        if marker and (fence is None or marker.group(1) == fence):
+            fence = marker.group(1) if fence is None else None
+            lines.append(raw_line.strip())
+            continue
+        if fence is not None:
+            lines.append(raw_line.rstrip())
+            continue
+        heading = _HEADING_RE.match(raw_line)
+        if heading:
+            text = _inline_to_text(heading.group(2))
+            lines.append(f"{heading.group(1)} {text}" if text else "")
+            continue
+        if _SETEXT_RE.match(raw_line) and lines and lines[-1].strip():
+            # "Title\n=====" style heading underline
+            level = "#" if raw_line.strip().startswith("=") else "##"
+            lines[-1] = f"{level} {lines[-1].strip()}"
+            continue
+        if _RULE_RE.match(raw_line):
+            lines.append("---")
+            continue
+        if "|" in raw_line and _TABLE_SEPARATOR_RE.match(raw_line):
+            continue
+        lines.append(_inline_to_text(raw_line))
+    text = "\n".join(lines)
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def read_markdown_file(path):
+    """
+    Reads and converts one Markdown file. Returns (path, text); runs inside pool workers.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return path, markdown_to_text(f.read())
+
+
+def load_markdown_file_fast(path):
+    """
+    Loads a single Markdown file as a list with one Document.
+    """
+    from langchain_core.documents import Document
+
+    path, text = read_markdown_file(path)
+    return [Document(page_content=text, metadata={"source": path})]
+
+
+def iter_markdown_files_fast(files, max_workers=MARKDOWN_LOADER_WORKERS):
+    """
+    Streams Documents for Markdown files read in parallel with a process pool, in input order.
+    Files are submitted in windows so only a bounded number of parsed files wait in memory.
+
+    Yields:
+        Document: One per file, with {"source": path} metadata.
+    """
+    from langchain_core.documents import Document
+
+    files = list(files)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if len(files) < _MIN_FILES_FOR_POOL or max_workers <= 1:
+        for path in files:
+            path, text = read_markdown_file(path)
+            yield Document(page_content=text, metadata={"source": path})
+        return
+    window = max_workers * 8
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for start in range(0, len(files), window):
+            part = files[start : start + window]
+            chunksize = max(1, len(part) // max_workers)
+            for path, text in executor.map(
+                read_markdown_file, part, chunksize=chunksize
+            ):
+                yield Document(page_content=text, metadata={"source": path})
+
+
+def load_markdown_files_fast(files, max_workers=MARKDOWN_LOADER_WORKERS):
+    """
+    Loads Markdown files in parallel with a process pool, preserving input order.
+
+    Returns:
+        list: One Document per file, with {"source": path} metadata.
+    """
+    return list(iter_markdown_files_fast(files, max_workers))
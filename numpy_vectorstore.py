@@ -0,0 +1,293 @@
+"""
+Memory-mapped NumPy vector store, an alternative to Chroma for serving queries.
+
+- Chroma stays the store that is built and updated; after every build its chunks are
+  exported next to it as a float32 (or float16) embedding matrix (NUMPY_VECTORS_FILE,
+  opened with mmap) and a sidecar JSON with the chunk ids, texts and metadata
+- Queries are an exact, vectorized brute-force search: one matrix-vector product over the
+  matrix, then a partial sort for the top k. Results are exact (HNSW is approximate) and
+  opening the store is near-instant, but every query reads the whole matrix, so latency
+  grows with the chunk count; bench_vectorstore.py measures the trade-off on a given index
+- Distances are squared L2 like Chroma's default, so relevance scores (and the thresholds
+  tuned on them) are the same with either backend
+- Tied to the index version: a missing or stale export is rebuilt from the collection on
+  first use, like the BM25 index
+- Supports the Chroma metadata filters the query router produces (see search_utils)
+
+Select it with VECTOR_STORE_BACKEND = "numpy"; compare it with Chroma with bench_vectorstore.py.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from log_utils import debug_log, output_log
+from config import NUMPY_VECTOR_DTYPE
+from search_utils import FilterMasks
+
+NUMPY_VECTORS_FILE = "vectors.npy"
+NUMPY_METADATA_FILE = "vectors.json"
+# Rows multiplied at a time, so float16 rows are upcast in small blocks, not all at once
+BLOCK_ROWS = 8192
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Read-only vector store over an (n, dimensions) embedding matrix. vectors may be a
+    memory-mapped array; ids, documents and metadatas are aligned with its rows.
+    """
+
+    def __init__(
+        self,
+        vectors,
+        ids,
+        documents,
+        metadatas,
+        embedding_function=None,
+        norms=None,
+        index_version=None,
+    ):
+        self.vectors = vectors
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.embedding_function = embedding_function
+        if norms is None:
+            norms = [float(row.astype(np.float32) @ row) for row in vectors]
+        self.norms = np.asarray(norms, dtype=np.float32)
+        self.index_version = index_version
+        self._positions = None
+        self.masks = FilterMasks(metadatas)
+
+    @property
+    def embeddings(self):
+        return self.embedding_function
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, **kwargs):
+        """
+        Builds an in-memory store by embedding texts.
+        """
+        texts = list(texts)
+        vectors = np.asarray(embedding.embed_documents(texts), dtype=np.float32)
+        return cls(
+            vectors,
+            list(ids) if ids is not None else [str(uuid.uuid4()) for _ in texts],
+            texts,
+            list(metadatas) if metadatas is not None else [{} for _ in texts],
+            embedding_function=embedding,
+        )
+
+    @classmethod
+    def load(cls, persist_directory, embedding_function=None):
+        """
+        Opens the exported index in persist_directory; the embedding matrix is memory-mapped.
+        """
+        with open(
+            os.path.join(persist_directory, NUMPY_METADATA_FILE), "r", encoding="utf-8"
+        ) as f:
+            data = json.load(f)
+        vectors = np.load(
+            os.path.join(persist_directory, NUMPY_VECTORS_FILE), mmap_mode="r"
+        )
+        if len(vectors) != len(data["ids"]):
+            raise ValueError(
+                f"{NUMPY_VECTORS_FILE} has {len(vectors)} rows, "
+                f"{NUMPY_METADATA_FILE} lists {len(data['ids'])} chunks"
+            )
+        return cls(
+            vectors,
+            data["ids"],
+            data["documents"],
+            data["metadatas"],
+            embedding_function=embedding_function,
+            norms=data["norms"],
+            index_version=data.get("index_version"),
+        )
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    def _distances(self, embedding):
+        query = np.asarray(embedding, dtype=np.float32)
+        if self.vectors.dtype == np.float32:
+            return np.maximum(
+                self.norms - 2 * (self.vectors @ query) + query @ query, 0
+            )
+        dots = np.empty(len(self.ids), dtype=np.float32)
+        for start in range(0, len(self.ids), BLOCK_ROWS):
+            block = self.vectors[start : start + BLOCK_ROWS]
+            dots[start : start + len(block)] = (
+                block.astype(np.float32, copy=False) @ query
+            )
+        return np.maximum(self.norms - 2 * dots + query @ query, 0)
+
+    def _document(self, position):
+        return Document(
+            page_content=self.documents[position],
+            metadata=dict(self.metadatas[position] or {}),
+        )
+
+    def similarity_search_by_vector_with_score(self, embedding, k=4, filter=None):
+        """
+        Returns the k (Document, squared L2 distance) pairs nearest to embedding, nearest
+        first, among the chunks matching the Chroma-style filter.
+        """
+        if not self.ids:
+            return []
+        distances = self._distances(embedding)
+        candidates = np.arange(len(self.ids))
+        if filter:
+            candidates = np.flatnonzero(self.masks.get(filter))
+            distances = distances[candidates]
+        if len(candidates) > k:
+            top = np.argpartition(distances, k)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(distances[top], kind="stable")]
+        return [(self._document(candidates[i]), float(distances[i])) for i in top]
+
+    def similarity_search_by_vector(self, embedding, k=4, filter=None, **kwargs):
+        return [
+            doc
+            for doc, _ in self.similarity_search_by_vector_with_score(
+                embedding, k, filter
+            )
+        ]
+
+    def similarity_search_with_score(self, query, k=4, filter=None, **kwargs):
+        return self.similarity_search_by_vector_with_score(
+            self.embedding_function.embed_query(query), k, filter
+        )
+
+    def similarity_search(self, query, k=4, filter=None, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, filter)]
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None):
+        """
+        Returns chunks like Chroma's get(): {"ids", "documents", "metadatas"} (and
+        "embeddings" if included), selected by ids and/or a where filter.
+        """
+        if include is None:
+            include = ["documents", "metadatas"]
+        if ids is not None:
+            if self._positions is None:
+                self._positions = {chunk_id: i for i, chunk_id in enumerate(self.ids)}
+            positions = [self._positions[i] for i in ids if i in self._positions]
+        else:
+            positions = list(range(len(self.ids)))
+        if where:
+            mask = self.masks.get(where)
+            positions = [i for i in positions if mask[i]]
+        positions = positions[offset or 0 :]
+        if limit is not None:
+            positions = positions[:limit]
+        result = {"ids": [self.ids[i] for i in positions]}
+        if "documents" in include:
+            result["documents"] = [self.documents[i] for i in positions]
+        if "metadatas" in include:
+            result["metadatas"] = [self.metadatas[i] for i in positions]
+        if "embeddings" in include:
+            result["embeddings"] = np.asarray(self.vectors[positions], dtype=np.float32)
+        return result
+
+
+def export_numpy_index(
+    persist_directory, index_version=None, dtype=NUMPY_VECTOR_DTYPE, page_size=5000
+):
+    """
+    Exports the chunks of the Chroma collection in persist_directory as a memory-mappable
+    embedding matrix plus sidecar metadata, written atomically next to it.
+    """
+    from langchain_chroma import Chroma
+    from index_health import collection_stats
+
+    started = time.perf_counter()
+    count, dimensions = collection_stats(persist_directory)
+    vectors_path = os.path.join(persist_directory, NUMPY_VECTORS_FILE)
+    metadata_path = os.path.join(persist_directory, NUMPY_METADATA_FILE)
+    # open_memmap writes the matrix page by page, so it is never held in memory in full
+    vectors = np.lib.format.open_memmap(
+        vectors_path + ".tmp", mode="w+", dtype=dtype, shape=(count, dimensions or 0)
+    )
+    collection = Chroma(persist_directory=persist_directory)._collection
+    ids, documents, metadatas, norms = [], [], [], []
+    while len(ids) < count:
+        page = collection.get(
+            limit=page_size,
+            offset=len(ids),
+            include=["embeddings", "documents", "metadatas"],
+        )
+        if not page["ids"]:
+            break
+        rows = np.asarray(page["embeddings"], dtype=dtype)
+        vectors[len(ids) : len(ids) + len(rows)] = rows
+        rows = rows.astype(np.float32)
+        norms.extend(np.einsum("ij,ij->i", rows, rows).tolist())
+        ids.extend(page["ids"])
+        documents.extend(page["documents"])
+        metadatas.extend(page["metadatas"])
+    if len(ids) != count:
+        raise RuntimeError(
+            f"Chroma collection returned {len(ids)} of {count} chunks during export"
+        )
+    vectors.flush()
+    del vectors
+    os.replace(vectors_path + ".tmp", vectors_path)
+
+    with open(metadata_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "version": 1,
+                "index_version": index_version,
+                "dtype": np.dtype(dtype).name,
+                "ids": ids,
+                "documents": documents,
+                "metadatas": metadatas,
+                "norms": norms,
+            },
+            f,
+            separators=(",", ":"),
+        )
+    os.replace(metadata_path + ".tmp", metadata_path)
+    output_log(
+        f"NumPy vector index: {count} chunks x {dimensions} dimensions ({dtype}) "
+        f"in {time.perf_counter() - started:.1f}s."
+    )
+
+
+_lock = threading.Lock()
+_stores = {}
+
+
+def get_numpy_vectorstore(persist_directory, embedding_function=None):
+    """
+    Returns the NumPy vector store for the current version of the index in
+    persist_directory, exporting it from the Chroma collection when missing or stale.
+    Returns None if there is no index manifest yet.
+    """
+    from rag_pipeline import index_version
+
+    version = index_version(persist_directory)
+    if version is None:
+        return None
+    with _lock:
+        store = _stores.get(persist_directory)
+        if store is not None and store.index_version == version:
+            return store
+        store = None
+        try:
+            store = NumpyVectorStore.load(persist_directory, embedding_function)
+        except (OSError, ValueError, KeyError) as e:
+            debug_log(f"Could not open NumPy vector index in {persist_directory}: {e}")
+        if store is None or store.index_version != version:
+            export_numpy_index(persist_directory, version)
+            store = NumpyVectorStore.load(persist_directory, embedding_function)
+        _stores[persist_directory] = store
+        return store
@@ -1,4 +1,3 @@
-# TODO Case for multiple people with the same name
 # TODO Data not trained for handling more detailed people queries
 
 
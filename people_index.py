@@ -0,0 +1,317 @@
+"""
+Exact lookup index over the people records in people.md.
+
+- Built by fetch_and_store_people_data next to people.md (PEOPLE_INDEX_FILE), and rebuilt
+  from people.md whenever the index is missing or was built from another version of it
+- Holds name tokens, a prefix trie over them and per-field lookups (email, department,
+  designation), so people questions resolve without an embedding call or vector search
+- Every person sharing a name is returned, so same-name questions list all of them
+
+Usage:
+    python people_index.py   # rebuild the index from the current people.md
+"""
+
+import os
+import re
+import ast
+import json
+import time
+import hashlib
+import threading
+
+from langchain_core.documents import Document
+
+from log_utils import debug_log, output_log
+from config import PEOPLE_MD_DIR, PEOPLE_INDEX_FILE, PEOPLE_INDEX_MAX_MATCHES
+from search_utils import tokenize
+
+PEOPLE_MD_FILE = "people.md"
+LOOKUP_FIELDS = ("email", "department", "designation")
+# Question words that are never treated as (partial) names
+STOPWORDS = {
+    "a", "about", "all", "an", "and", "any", "anyone", "are", "at", "can", "contact",
+    "department", "designation", "detail", "details", "do", "does", "email", "for", "from",
+    "give", "has", "he", "her", "him", "his", "how", "i", "in", "info", "information", "is",
+    "leapfrog", "list", "me", "mobile", "named", "number", "of", "people", "person", "phone",
+    "reach", "she", "show", "tell", "the", "their", "them", "they", "to", "vyaguta", "what",
+    "when", "where", "which", "who", "whom", "whose", "with", "work", "works",
+}  # fmt: skip
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+
+def normalize(value):
+    return " ".join(tokenize(value))
+
+
+def field_text(value):
+    """
+    Returns the display text of a people.md field value; nested API objects
+    (e.g. "{'id': 3, 'name': 'Engineering'}") yield their name or title.
+    """
+    value = value.strip()
+    if value.startswith("{"):
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return value
+        if isinstance(parsed, dict):
+            return str(parsed.get("name") or parsed.get("title") or value)
+    return value
+
+
+def parse_people_markdown(text):
+    """
+    Parses people.md into records: {"name", "fields" (key -> text), "text" (markdown section)}.
+    """
+    records = []
+    for section in re.split(r"\n---\n", text):
+        section = section.strip()
+        if not section.startswith("# "):
+            continue
+        lines = section.splitlines()
+        fields = {}
+        for line in lines[1:]:
+            if line.startswith("- ") and ":" in line:
+                key, value = line[2:].split(":", 1)
+                fields[key.strip()] = field_text(value)
+        records.append(
+            {"name": lines[0][2:].strip(), "fields": fields, "text": section}
+        )
+    return records
+
+
+def file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class PeopleIndex:
+    """
+    In-memory people lookup. records are parse_people_markdown output; name_tokens maps a
+    name token to record ids, trie is a character trie over the name tokens ("$" marks the
+    end of a token) and fields maps each LOOKUP_FIELDS field to {normalized value: ids}.
+    """
+
+    def __init__(self, records, name_tokens, trie, fields, source_sha256=None):
+        self.records = records
+        self.name_tokens = name_tokens
+        self.trie = trie
+        self.fields = fields
+        self.source_sha256 = source_sha256
+        # Longest value first, so "senior software engineer" wins over "software engineer"
+        self.field_values = {
+            field: sorted(values, key=len, reverse=True)
+            for field, values in fields.items()
+        }
+
+    @classmethod
+    def build(cls, records, source_sha256=None):
+        name_tokens = {}
+        fields = {field: {} for field in LOOKUP_FIELDS}
+        for record_id, record in enumerate(records):
+            for token in set(tokenize(record["name"])):
+                name_tokens.setdefault(token, []).append(record_id)
+            for field in LOOKUP_FIELDS:
+                value = record["fields"].get(field, "")
+                value = value.strip().lower() if field == "email" else normalize(value)
+                if value:
+                    fields[field].setdefault(value, []).append(record_id)
+        trie = {}
+        for token in name_tokens:
+            node = trie
+            for char in token:
+                node = node.setdefault(char, {})
+            node["$"] = token
+        return cls(records, name_tokens, trie, fields, source_sha256)
+
+    @classmethod
+    def from_markdown(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        return cls.build(parse_people_markdown(text), file_sha256(path))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data["records"],
+            data["name_tokens"],
+            data["trie"],
+            data["fields"],
+            data.get("source_sha256"),
+        )
+
+    def save(self, path):
+        """
+        Writes the index atomically as compact JSON.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": 1,
+                    "source_sha256": self.source_sha256,
+                    "records": self.records,
+                    "name_tokens": self.name_tokens,
+                    "trie": self.trie,
+                    "fields": self.fields,
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, path)
+
+    def complete(self, prefix):
+        """
+        Returns the name tokens starting with prefix.
+        """
+        node = self.trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        tokens, stack = [], [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == "$":
+                    tokens.append(child)
+                else:
+                    stack.append(child)
+        return tokens
+
+    def _match_names(self, tokens):
+        """
+        Returns the ids of the records whose names match the most query tokens, exact
+        token matches first, then prefix matches ("Kail" -> "Kailash").
+        """
+        for lookup in (self.name_tokens.get, self._prefix_ids):
+            scores = {}
+            for token in tokens:
+                for record_id in set(lookup(token) or ()):
+                    scores[record_id] = scores.get(record_id, 0) + 1
+            if scores:
+                best = max(scores.values())
+                return [i for i, score in scores.items() if score == best]
+        return []
+
+    def _prefix_ids(self, token):
+        if len(token) < 3:
+            return []
+        return [i for name in self.complete(token) for i in self.name_tokens[name]]
+
+    def _match_field(self, field, text):
+        padded = f" {text} "
+        for value in self.field_values[field]:
+            if f" {value} " in padded:
+                return self.fields[field][value]
+        return []
+
+    def search(self, question):
+        """
+        Returns the records matching question: by email address, then by name, then by
+        department or designation mentioned in it. Same-name records are all returned.
+        """
+        emails = EMAIL_PATTERN.findall(question.lower())
+        ids = [i for email in emails for i in self.fields["email"].get(email, [])]
+        if not ids:
+            tokens = [t for t in tokenize(question) if t not in STOPWORDS]
+            ids = self._match_names(tokens)
+        if not ids:
+            # Plurals match too ("QA Engineers" -> "qa engineer")
+            text = " ".join(
+                t[:-1] if len(t) > 3 and t.endswith("s") else t
+                for t in tokenize(question)
+            )
+            text = f"{normalize(question)} | {text}"
+            ids = self._match_field("designation", text) or self._match_field(
+                "department", text
+            )
+        return [self.records[i] for i in sorted(set(ids))]
+
+
+def people_index_path(directory=PEOPLE_MD_DIR):
+    return os.path.join(directory, PEOPLE_INDEX_FILE)
+
+
+def build_people_index(directory=PEOPLE_MD_DIR):
+    """
+    Builds the people index from people.md in directory and saves it next to it.
+    """
+    started = time.perf_counter()
+    index = PeopleIndex.from_markdown(os.path.join(directory, PEOPLE_MD_FILE))
+    index.save(people_index_path(directory))
+    output_log(
+        f"People index: {len(index.records)} people, {len(index.name_tokens)} name tokens "
+        f"in {time.perf_counter() - started:.2f}s."
+    )
+    return index
+
+
+_lock = threading.Lock()
+_index = None  # (people.md mtime, PeopleIndex)
+
+
+def get_people_index(directory=PEOPLE_MD_DIR):
+    """
+    Returns the people index for the current people.md, or None if there is no people.md.
+    The saved index is reused when it was built from the same people.md; otherwise it is rebuilt.
+    """
+    global _index
+    md_path = os.path.join(directory, PEOPLE_MD_FILE)
+    try:
+        mtime = os.stat(md_path).st_mtime_ns
+    except OSError:
+        return None
+    with _lock:
+        if _index is None or _index[0] != mtime:
+            index = None
+            try:
+                index = PeopleIndex.load(people_index_path(directory))
+            except (OSError, ValueError, KeyError) as e:
+                debug_log(f"Could not read people index: {e}")
+            if index is None or index.source_sha256 != file_sha256(md_path):
+                index = build_people_index(directory)
+            _index = (mtime, index)
+        return _index[1]
+
+
+def people_documents(question, max_matches=PEOPLE_INDEX_MAX_MATCHES):
+    """
+    Returns the people records matching question as Documents (empty if none match or
+    there is no people data). When more than max_matches people match, the first Document
+    says how many matched, so the answer does not present the list as complete.
+    """
+    index = get_people_index()
+    if index is None:
+        return []
+    started = time.perf_counter()
+    records = index.search(question)
+    debug_log(
+        f"People index: {len(records)} matches in "
+        f"{(time.perf_counter() - started) * 1e6:.0f}us"
+    )
+    source = os.path.join(PEOPLE_MD_DIR, PEOPLE_MD_FILE)
+    docs = [
+        Document(
+            page_content=record["text"],
+            metadata={
+                "source": source,
+                "source_type": "people",
+                "person": record["name"],
+            },
+        )
+        for record in records[:max_matches]
+    ]
+    if len(records) > max_matches:
+        debug_log(f"People index: showing {max_matches} of {len(records)} matches")
+        docs[0].page_content = (
+            f"Note: {len(records)} people match this question; only the first "
+            f"{max_matches} are listed. Say so in the answer.\n\n{docs[0].page_content}"
+        )
+    return docs
+
+
+if __name__ == "__main__":
+    build_people_index()
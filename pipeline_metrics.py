@@ -0,0 +1,72 @@
+"""
+Per-stage throughput metrics for the streaming ingestion pipeline (load -> chunk -> embed -> store).
+
+Each stage is a generator; StageMeter wraps a stage's output and measures how long the consumer
+waited for it. Since a stage pulls from its upstream while producing, a stage's own time is its
+measured time minus the time of the stage before it, which shows where the bottleneck is.
+"""
+
+import time
+
+from log_utils import output_log
+
+
+class StageMeter:
+    """
+    Counts items, characters and wall time spent producing them for one pipeline stage.
+    """
+
+    def __init__(self, name, upstream=None):
+        self.name = name
+        self.upstream = upstream
+        self.items = 0
+        self.chars = 0
+        self.seconds = 0.0
+
+    def wrap(self, iterable):
+        """
+        Yields the items of iterable while recording how long each one took to produce.
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds += time.perf_counter() - start
+                return
+            self.seconds += time.perf_counter() - start
+            self.items += 1
+            self.chars += len(getattr(item, "page_content", ""))
+            yield item
+
+    @property
+    def own_seconds(self):
+        """
+        Time spent in this stage alone, excluding the upstream stage it pulls from.
+        """
+        upstream = self.upstream.seconds if self.upstream else 0.0
+        return max(0.0, self.seconds - upstream)
+
+    def summary(self):
+        rate = self.items / self.own_seconds if self.own_seconds else float("inf")
+        return (
+            f"{self.name}: {self.items} items, {self.chars} chars in "
+            f"{self.own_seconds:.2f}s ({rate:.1f} items/sec)"
+        )
+
+
+def log_stage_stats(meters, store_stats=None):
+    """
+    Logs one line per pipeline stage, plus the embed/store stage from embed_and_store stats.
+    """
+    for meter in meters:
+        output_log(f"Pipeline stage {meter.summary()}")
+    if store_stats:
+        upstream = meters[-1].seconds if meters else 0.0
+        own = max(0.0, store_stats["seconds"] - upstream)
+        rate = store_stats["chunks"] / own if own else float("inf")
+        output_log(
+            f"Pipeline stage embed+store: {store_stats['chunks']} chunks in "
+            f"{own:.2f}s ({rate:.1f} items/sec)"
+        )
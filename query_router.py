@@ -0,0 +1,269 @@
+"""
+Query routing in front of the QA chain.
+
+- Picks a retrieval path per question: "people" (people records only), "docs" (everything
+  except people records), "confluence" (one Confluence space, or all of them), "general"
+  (no retrieval, answered from the LLM's general knowledge) or "all" (unfiltered search)
+- Cheap regex rules decide first; otherwise a small naive Bayes classifier trained on the
+  example questions below picks the path, falling back to "all" when it is not confident
+- Each path maps to a Chroma metadata filter on the source_type/space chunk metadata
+  (see rag_pipeline.source_metadata) and its own chunk budget (ROUTER_K), so narrow
+  questions scan fewer chunks and send fewer of them to the LLM
+"""
+
+import re
+import math
+import threading
+from collections import Counter
+from typing import NamedTuple, Optional
+
+from log_utils import debug_log
+from config import ROUTER_MIN_CONFIDENCE, ROUTER_GENERAL_CONFIDENCE, ROUTER_K
+from search_utils import tokenize
+
+GENERAL = "general"
+
+# Words that follow "who is/are/was" in questions that do not name anyone
+# ("Who is on leave today?", "Who is responsible for payroll?")
+NOT_NAMES = (
+    "the a an my our your their his her this that these those there here it he she they "
+    "we you i me us him them someone anyone everyone nobody all any some each every "
+    "on in at to for from with by of off out not no also still currently now today "
+    "going working responsible eligible available allowed supposed able absent away "
+    "leaving joining new online present next last first best most"
+).split()
+
+# Questions about a person, e.g. "Who is Purna?", "email of Kailash", "people named Anish"
+PEOPLE_PATTERNS = [
+    # "who is" needs a name-like word after it
+    re.compile(
+        r"^\s*who\s+(?:is|are|was)\s+(?!(?:" + "|".join(NOT_NAMES) + r")\b)[a-z]"
+    ),
+    re.compile(
+        r"\b(?:email|e-mail|phone|mobile|contact\s+(?:details|number|info)|designation|"
+        r"department|join(?:ing)?\s+date|working\s+shift)\s+(?:of|for)\s+\w"
+    ),
+    re.compile(r"\b(?:people|persons?|anyone|someone|employees?)\s+named\b"),
+]
+# Explicit references to the Confluence wiki or one of its spaces ("in the LEAP space")
+CONFLUENCE_PATTERN = re.compile(r"\b(?:confluence|wiki)\b")
+# Organisation-specific wording: such questions are never answered without retrieval
+ORG_PATTERN = re.compile(
+    r"\b(?:vyaguta|leapfrog|lf|lftechnology|our|we|us|company|office|colleagues?|"
+    r"employees?|team\s+members?|onboarding|policy|policies|leaves?|holidays?|"
+    r"reimbursements?|benefits?|promotions?|appraisal|worklogs?|okr|pulse|jump)\b"
+)
+
+# Seed questions for the local classifier
+TRAINING_EXAMPLES = {
+    "people": [
+        "who is purna bahadur shrestha",
+        "tell me about kailash",
+        "how do i contact anish",
+        "what is the email of sita",
+        "what is ram's phone number",
+        "which department does hari work in",
+        "what is the designation of gita",
+        "when did bikash join the company",
+        "who works in the qa department",
+        "list people named sanjay",
+        "mobile number of the associate engineer",
+        "what is the working shift of nabin",
+        "where is prakash based",
+        "introduce our senior software engineer sujan",
+    ],
+    "docs": [
+        "what is vyaguta",
+        "how does the onboarding process work",
+        "what are the leave types and guidelines",
+        "how do i apply for leave",
+        "how to fill a worklog",
+        "describe the okr module",
+        "what are the employee benefits in nepal",
+        "explain the performance improvement plan",
+        "team outing reimbursement guidelines",
+        "promotions in q3 2025",
+        "how to make a pr at vyaguta",
+        "how to install the attendance module locally",
+        "what are the brand guidelines",
+        "job description of a devops engineer",
+        "responsibilities of a senior software engineer",
+        "what is the role of a team lead",
+        "career path for an associate engineer",
+        "what is the lunch and snacks menu",
+        "how do i report a bug in slack",
+        "what are the speak up channels",
+        "company calendar and holidays",
+        "tell me about the attendance module",
+        "tell me about pulse surveys",
+        "who handles questions about the payroll",
+        "who can approve my worklog",
+        "who is on the leave calendar this week",
+    ],
+    GENERAL: [
+        "what is rest api",
+        "explain dependency injection",
+        "what is the difference between tcp and udp",
+        "how does garbage collection work in java",
+        "what is a docker container",
+        "explain the solid principles",
+        "what is kubernetes",
+        "difference between sql and nosql databases",
+        "what is recursion",
+        "how does https work",
+        "what is a linked list",
+        "explain big o notation",
+        "what is continuous integration",
+        "what is object oriented programming",
+        "how does git rebase work",
+        "what is a race condition",
+    ],
+}
+
+
+class NaiveBayesClassifier:
+    """
+    Multinomial naive Bayes over word counts with Laplace smoothing. Tiny and dependency-free:
+    training and prediction take microseconds.
+    """
+
+    def __init__(self, examples, alpha=1.0):
+        self.alpha = alpha
+        self.labels = list(examples)
+        total_examples = sum(len(texts) for texts in examples.values())
+        self.priors = {
+            label: math.log(len(texts) / total_examples)
+            for label, texts in examples.items()
+        }
+        self.counts = {
+            label: Counter(token for text in texts for token in tokenize(text))
+            for label, texts in examples.items()
+        }
+        self.totals = {label: sum(c.values()) for label, c in self.counts.items()}
+        self.vocabulary = set().union(*self.counts.values())
+
+    def predict(self, text):
+        """
+        Returns (label, probability) of the most likely label for text.
+        """
+        tokens = [t for t in tokenize(text) if t in self.vocabulary]
+        size = len(self.vocabulary)
+        scores = {}
+        for label in self.labels:
+            denominator = self.totals[label] + self.alpha * size
+            scores[label] = self.priors[label] + sum(
+                math.log((self.counts[label][t] + self.alpha) / denominator)
+                for t in tokens
+            )
+        best = max(scores, key=scores.get)
+        normalizer = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / normalizer
+
+
+class Route(NamedTuple):
+    """
+    A retrieval path: filter is the Chroma metadata filter (None searches everything) and
+    k the number of chunks to retrieve.
+    """
+
+    name: str
+    filter: Optional[dict]
+    k: Optional[int]
+    reason: str
+
+    @property
+    def retrieve(self):
+        return self.name != GENERAL
+
+
+class QueryRouter:
+    """
+    Routes questions to a retrieval path. spaces are the Confluence space keys present in
+    the index (lowercase folder names under CONFLUENCE_MD_DIR).
+    """
+
+    def __init__(self, spaces=(), classifier=None):
+        self.spaces = sorted(spaces)
+        self.classifier = classifier or NaiveBayesClassifier(TRAINING_EXAMPLES)
+
+    def _route(self, name, reason, space=None):
+        filters = {
+            "people": {"source_type": "people"},
+            "docs": {"source_type": {"$ne": "people"}},
+            "confluence": (
+                {"$and": [{"source_type": "confluence"}, {"space": space}]}
+                if space
+                else {"source_type": "confluence"}
+            ),
+        }
+        return Route(name, filters.get(name), ROUTER_K.get(name), reason)
+
+    def mentioned_space(self, text):
+        """
+        Returns the space explicitly referred to in text ("LEAP space", "vyaguta wiki"), or None.
+        """
+        for space in self.spaces:
+            if re.search(rf"\b{re.escape(space)}\s+(?:space|wiki|confluence)\b", text):
+                return space
+        return None
+
+    def route(self, question):
+        text = " ".join(question.lower().split())
+        space = self.mentioned_space(text)
+        if space or CONFLUENCE_PATTERN.search(text):
+            return self._route("confluence", "rule: confluence", space)
+        if any(pattern.search(text) for pattern in PEOPLE_PATTERNS):
+            return self._route("people", "rule: person")
+
+        label, probability = self.classifier.predict(text)
+        reason = f"classifier: {label} ({probability:.2f})"
+        if label == GENERAL:
+            if probability >= ROUTER_GENERAL_CONFIDENCE and not ORG_PATTERN.search(
+                text
+            ):
+                return self._route(GENERAL, reason)
+        elif probability >= ROUTER_MIN_CONFIDENCE:
+            return self._route(label, reason)
+        return self._route("all", reason)
+
+
+def indexed_spaces():
+    """
+    Returns the Confluence spaces that have pages in the current index manifest.
+    """
+    from rag_pipeline import load_manifest, source_metadata
+
+    manifest = load_manifest() or {}
+    spaces = (
+        source_metadata(source).get("space") for source in manifest.get("files", {})
+    )
+    return {space for space in spaces if space}
+
+
+_lock = threading.Lock()
+_router = None  # (index version, QueryRouter)
+
+
+def get_query_router():
+    """
+    Returns the shared QueryRouter, rebuilt when the index version changes (new spaces).
+    """
+    global _router
+    from rag_pipeline import index_version
+
+    version = index_version()
+    with _lock:
+        if _router is None or _router[0] != version:
+            _router = (version, QueryRouter(indexed_spaces()))
+        return _router[1]
+
+
+def route_query(question):
+    """
+    Routes question with the shared router and logs the chosen path.
+    """
+    route = get_query_router().route(question)
+    debug_log(
+        f"Query route: {route.name} ({route.reason}), filter={route.filter}, k={route.k}"
+    )
+    return route
@@ -1,205 +1,787 @@
 """
 RAG Pipeline Setup for Vyaguta Assistant
 
-- Loads and consolidates Markdown files from specified directories
-- Chunks text using RecursiveCharacterTextSplitter
-- Embeds chunks using OpenAI Embeddings
+- Loads and consolidates Markdown files from specified directories (in parallel with the fast loader)
+- Chunks text along markdown headings/separators (or with RecursiveCharacterTextSplitter)
+- Streams load -> chunk -> dedup -> embed -> store as lazy generators with bounded buffering
+- Embeds chunks using OpenAI Embeddings (through a persistent embedding cache)
+  in token-packed batches sent concurrently
 - Stores embeddings in Chroma vector store
-- Provides retriever for RAG workflow
-- Serializes document list for reuse
+- Provides retriever for RAG workflow, built lazily on first query after a local index health check
+- Tags chunks with source_type/space metadata so the query router can narrow each search
+- Keeps a local BM25 index next to Chroma for hybrid (lexical + vector) retrieval
+- Can serve queries from a memory-mapped NumPy export of the index instead of Chroma
+- Stores loaded documents in a streaming JSONL document store for reuse
+- Keeps a manifest of per-file content hashes and chunk IDs for incremental re-indexing
+- Checkpoints ingestion so an interrupted build resumes instead of starting over
 """
 
 import os
 import glob
-import pickle
+import json
+import hashlib
+import itertools
 from dotenv import load_dotenv
-from langchain_community.document_loaders import UnstructuredMarkdownLoader
 from langchain_core.documents import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 
 from log_utils import debug_log, output_log
-from config import DOC_DIRECTORIES
+from config import (
+    DOC_DIRECTORIES,
+    MARKDOWN_LOADER,
+    CHUNKER,
+    DEDUP_ENABLED,
+    DEDUP_THRESHOLD,
+    CHUNK_SIZE,
+    CHUNK_OVERLAP,
+    MAX_CHARS,
+    RETRIEVER_K,
+    ROUTER_ENABLED,
+    PEOPLE_INDEX_ENABLED,
+    HYBRID_ENABLED,
+    ADAPTIVE_K_ENABLED,
+    CONTEXT_PACKING_ENABLED,
+    CONTEXT_MAX_TOKENS,
+    RERANK_ENABLED,
+    RERANK_CANDIDATES,
+    RERANK_TOP_N,
+    RERANK_BUDGET_MS,
+    VECTOR_STORE_BACKEND,
+    PEOPLE_MD_DIR,
+    CONFLUENCE_MD_DIR,
+)
+from ingest_checkpoint import (
+    CHECKPOINT_FILE,
+    IngestCheckpoint,
+    fingerprint,
+    is_index_complete,
+)
+from doc_store import DocStore, DocStoreWriter
 
 
 load_dotenv()
 
-DOCS_PICKLE = "docs_consolidated.pkl"
+DOCS_STORE = "docs_store.jsonl"
+LEGACY_DOCS_PICKLE = "docs_consolidated.pkl"
 CHROMA_DIR = "chroma_db"
+MANIFEST_FILE = "index_manifest.json"
+# Bump when the metadata attached to chunks changes; older indexes are rebuilt
+CHUNK_METADATA_VERSION = 4
 
 
-def load_markdown_docs(directories=None):
+def get_embeddings():
     """
-    Loads all Markdown files from specified directories and returns a list of Document objects.
-    Supports nested subfolders (e.g., docs-confluence/vyaguta, docs-confluence/leap).
+    Returns the embedding function used for indexing and retrieval (shared process-wide, see clients).
+    """
+    from clients import get_embeddings as shared_embeddings
+
+    return shared_embeddings()
+
+
+def list_markdown_files(directories=None):
+    """
+    Returns the paths of all Markdown files under the specified directories (recursive).
     """
     if directories is None:
         directories = DOC_DIRECTORIES
-    all_docs = []
+    files = []
     for directory in directories:
-        for file in glob.glob(f"{directory}/**/*.md", recursive=True):
-            loader = UnstructuredMarkdownLoader(file)
-            doc = loader.load()
-            all_docs.extend(doc)
-    return all_docs
+        files.extend(glob.glob(f"{directory}/**/*.md", recursive=True))
+    return files
 
 
-def consolidate_and_serialize_docs(directories=None, pickle_path=DOCS_PICKLE):
+def load_markdown_file(file, loader=None):
     """
-    Loads, consolidates, and pickles all Markdown documents for fast reuse.
+    Loads a single Markdown file and returns its list of Document objects.
+    loader is "fast" or "unstructured" (defaults to config.MARKDOWN_LOADER).
     """
-    docs = load_markdown_docs(directories)
-    with open(pickle_path, "wb") as f:
-        pickle.dump(docs, f)
-    return docs
+    if (loader or MARKDOWN_LOADER) == "fast":
+        from markdown_loader import load_markdown_file_fast
+
+        return load_markdown_file_fast(file)
+    # Unstructured (and nltk) are slow to import, so only load them when selected
+    from langchain_community.document_loaders import UnstructuredMarkdownLoader
 
+    return UnstructuredMarkdownLoader(file).load()
 
-def load_docs_from_pickle(pickle_path=DOCS_PICKLE):
+
+def iter_markdown_files(files, loader=None):
+    """
+    Streams Document objects for the given Markdown files; the fast loader reads them in parallel.
     """
-    Loads Document objects from a pickle file.
+    if (loader or MARKDOWN_LOADER) == "fast":
+        from markdown_loader import iter_markdown_files_fast
+
+        yield from iter_markdown_files_fast(files)
+        return
+    for file in files:
+        yield from load_markdown_file(file, loader)
+
+
+def load_markdown_files(files, loader=None):
     """
-    with open(pickle_path, "rb") as f:
-        docs = pickle.load(f)
-    return docs
+    Loads the given Markdown files and returns a list of Document objects.
+    """
+    return list(iter_markdown_files(files, loader))
+
+
+def source_metadata(source):
+    """
+    Returns the routing metadata of a source file: source_type ("people", "confluence" or
+    "docs") and, for Confluence pages, the space (its lowercase folder under CONFLUENCE_MD_DIR).
+    """
+    parts = os.path.normpath(source).replace(os.sep, "/").split("/")
+    people_parts = os.path.normpath(PEOPLE_MD_DIR).replace(os.sep, "/").split("/")
+    if parts[: len(people_parts)] == people_parts:
+        return {"source_type": "people"}
+    if parts[0] == CONFLUENCE_MD_DIR:
+        if len(parts) > 2:
+            return {"source_type": "confluence", "space": parts[1].lower()}
+        return {"source_type": "confluence"}
+    return {"source_type": "docs"}
+
+
+def add_source_metadata(docs):
+    """
+    Adds the routing metadata (see source_metadata) to each document as it streams past.
+    """
+    for doc in docs:
+        doc.metadata.update(source_metadata(doc.metadata.get("source", "")))
+        yield doc
 
 
-def chunk_documents(docs, chunk_size=1000, chunk_overlap=200, max_chars=2000):
+def load_doc_store(store_path=DOCS_STORE):
     """
-    Chunks all documents using RecursiveCharacterTextSplitter for optimal embedding.
-    Uses a conservative chunk size and overlap to keep tables and context together, but ensures no chunk exceeds max_chars.
+    Returns the consolidated DocStore, or None if it has not been built.
+    A docs_consolidated.pkl left by older versions is converted to the store once.
     """
-    from config import CHUNK_SIZE, CHUNK_OVERLAP, MAX_CHARS
+    if DocStore.exists(store_path):
+        return DocStore(store_path)
+    if os.path.exists(LEGACY_DOCS_PICKLE):
+        import pickle
 
+        output_log(f"Converting {LEGACY_DOCS_PICKLE} to {store_path}.")
+        with open(LEGACY_DOCS_PICKLE, "rb") as f:
+            store = DocStore.write(pickle.load(f), store_path)
+        os.remove(LEGACY_DOCS_PICKLE)
+        return store
+    return None
+
+
+def loader_id():
+    """
+    Identifies the configured loader and the version of its output.
+    """
+    if MARKDOWN_LOADER == "fast":
+        from markdown_loader import FAST_LOADER_VERSION
+
+        return f"fast:{FAST_LOADER_VERSION}"
+    return MARKDOWN_LOADER
+
+
+def doc_store_meta(file_hashes):
+    """
+    Returns the document store metadata for documents loaded from file_hashes (source ->
+    content hash) with the configured loader; a store is reusable while this matches.
+    """
+    return {"loader": loader_id(), "files": file_hashes}
+
+
+def iter_chunks(
+    docs,
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+    max_chars=MAX_CHARS,
+    chunker=None,
+):
+    """
+    Lazily chunks documents for optimal embedding.
+    chunker is "markdown" or "recursive" (defaults to config.CHUNKER). The markdown chunker keeps
+    headings, tables and people records together (see markdown_chunker); the recursive one uses
+    RecursiveCharacterTextSplitter with a conservative chunk size and overlap, but ensures no chunk exceeds max_chars.
+
+    Yields:
+        Document: Chunks in document order, carrying their document's metadata.
+    """
+    if (chunker or CHUNKER) == "markdown":
+        from markdown_chunker import iter_markdown_chunks
+
+        yield from iter_markdown_chunks(docs, chunk_size, chunk_overlap, max_chars)
+        return
     splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap
+    )
+    sub_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=max_chars // 2, chunk_overlap=chunk_overlap // 2
     )
-    chunks = []
-    max_found = 0
     for doc in docs:
         for chunk in splitter.split_text(doc.page_content):
             # If chunk is too large, split further
-            if len(chunk) > MAX_CHARS:
-                sub_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=MAX_CHARS // 2, chunk_overlap=CHUNK_OVERLAP // 2
-                )
+            if len(chunk) > max_chars:
                 for sub_chunk in sub_splitter.split_text(chunk):
-                    chunks.append(
-                        Document(page_content=sub_chunk, metadata=doc.metadata)
-                    )
-                    if len(sub_chunk) > max_found:
-                        max_found = len(sub_chunk)
+                    yield Document(page_content=sub_chunk, metadata=doc.metadata)
             else:
-                chunks.append(Document(page_content=chunk, metadata=doc.metadata))
-                if len(chunk) > max_found:
-                    max_found = len(chunk)
-    debug_log(f"Largest chunk size: {max_found} characters")
-    return chunks
+                yield Document(page_content=chunk, metadata=doc.metadata)
+
+
+def file_content_hash(path):
+    """
+    Returns the SHA-256 hex digest of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id_prefix(source, content_hash):
+    """
+    Returns the deterministic Chroma ID prefix for the chunks of one file version.
+    """
+    return hashlib.sha1(f"{source}:{content_hash}".encode("utf-8")).hexdigest()[:16]
+
+
+def number_chunks(chunks):
+    """
+    Sets each chunk's position in its source file as chunk_index metadata, so neighbouring
+    chunks can be merged at query time. Runs before dedup, so the chunks around a dropped
+    duplicate do not look adjacent.
+    """
+    counters = {}
+    for chunk in chunks:
+        source = chunk.metadata.get("source")
+        chunk_index = counters.get(source, 0)
+        counters[source] = chunk_index + 1
+        chunk.metadata = {**chunk.metadata, "chunk_index": chunk_index}
+        yield chunk
+
+
+def iter_chunk_ids(chunks, file_hashes, files):
+    """
+    Streams (chunk_id, chunk) pairs; IDs are derived from the file version and chunk_index.
+    Fills files (the manifest "files" mapping of source -> hash and chunk IDs) as it goes;
+    files that produced no chunks are added once the stream is exhausted.
+    """
+    for chunk in chunks:
+        source = chunk.metadata.get("source")
+        if source not in files:
+            content_hash = file_hashes.get(source) or file_content_hash(source)
+            files[source] = {"sha256": content_hash, "chunk_ids": []}
+        entry = files[source]
+        chunk_index = chunk.metadata.get("chunk_index", len(entry["chunk_ids"]))
+        chunk_id = f"{chunk_id_prefix(source, entry['sha256'])}-{chunk_index}"
+        entry["chunk_ids"].append(chunk_id)
+        yield chunk_id, chunk
+    # Files that produced no chunks are still tracked so they are not reloaded every refresh
+    for source, content_hash in file_hashes.items():
+        files.setdefault(source, {"sha256": content_hash, "chunk_ids": []})
+
+
+def plan_fingerprint(file_hashes):
+    """
+    Identifies an ingestion run by its input file versions and chunking settings,
+    so an interrupted run can be recognised and resumed before any chunk is produced.
+    """
+    return fingerprint(
+        [
+            f"chunking:{CHUNKER}:{CHUNK_SIZE}:{CHUNK_OVERLAP}:{MAX_CHARS}",
+            f"dedup:{DEDUP_ENABLED}:{DEDUP_THRESHOLD}",
+            f"metadata:{CHUNK_METADATA_VERSION}",
+        ]
+        + [f"{source}:{file_hashes[source]}" for source in sorted(file_hashes)]
+    )
+
+
+def load_manifest(persist_directory=CHROMA_DIR):
+    """
+    Loads the index manifest stored alongside the Chroma DB, or None if missing or unreadable.
+    """
+    path = os.path.join(persist_directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        debug_log(f"Could not read index manifest {path}: {e}")
+        return None
+
+
+def save_manifest(files, persist_directory=CHROMA_DIR, embedding_dimensions=None):
+    """
+    Writes the index manifest (per-file content hash and chunk IDs) atomically.
+    embedding_dimensions is recorded so the startup health check can validate the index.
+    """
+    os.makedirs(persist_directory, exist_ok=True)
+    path = os.path.join(persist_directory, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+    manifest = {
+        "version": 1,
+        "files": files,
+        "index_version": manifest_index_version(files),
+        "chunk_metadata": CHUNK_METADATA_VERSION,
+    }
+    if embedding_dimensions:
+        manifest["embedding_dimensions"] = embedding_dimensions
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def manifest_index_version(files):
+    """
+    Returns a short hash identifying the indexed content (every chunk ID in the manifest).
+    """
+    return fingerprint(
+        sorted(chunk_id for entry in files.values() for chunk_id in entry["chunk_ids"])
+    )
+
+
+_index_versions = {}
+
+
+def index_version(persist_directory=CHROMA_DIR):
+    """
+    Returns the version of the persisted index, or None if there is no manifest.
+    The manifest is only re-read when it changes on disk, so this is cheap to call per query.
+    """
+    path = os.path.join(persist_directory, MANIFEST_FILE)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    cached = _index_versions.get(path)
+    if cached is None or cached[0] != mtime:
+        manifest = load_manifest(persist_directory)
+        if manifest is None:
+            return None
+        version = manifest.get("index_version") or manifest_index_version(
+            manifest.get("files", {})
+        )
+        cached = _index_versions[path] = (mtime, version)
+    return cached[1]
+
+
+def mark_index_complete(files, persist_directory=CHROMA_DIR):
+    """
+    Writes the index manifest and marks the ingestion checkpoint complete.
+    """
+    from index_health import collection_stats
+
+    _, dimensions = collection_stats(persist_directory)
+    save_manifest(files, persist_directory, embedding_dimensions=dimensions)
+    if HYBRID_ENABLED:
+        from bm25_index import build_bm25_index
 
+        build_bm25_index(persist_directory, manifest_index_version(files))
+    if VECTOR_STORE_BACKEND == "numpy":
+        from numpy_vectorstore import export_numpy_index
 
-def build_chroma_vectorstore(chunks, persist_directory=CHROMA_DIR):
+        export_numpy_index(persist_directory, manifest_index_version(files))
+    IngestCheckpoint(persist_directory).complete()
+
+
+def clear_chroma_index(persist_directory=CHROMA_DIR):
+    """
+    Removes the persisted Chroma index along with its manifest, BM25 and NumPy indexes and
+    checkpoint.
+    The collection is dropped through Chroma rather than by deleting its files, because a
+    client opened earlier in this process (e.g. by the health check) keeps the files open.
+    """
+    import shutil
+
+    if not os.path.exists(persist_directory):
+        return
+    try:
+        Chroma(persist_directory=persist_directory).delete_collection()
+    except Exception as e:
+        debug_log(
+            f"Could not delete Chroma collection, removing {persist_directory}: {e}"
+        )
+        shutil.rmtree(persist_directory)
+        return
+    from bm25_index import BM25_FILE
+    from numpy_vectorstore import NUMPY_VECTORS_FILE, NUMPY_METADATA_FILE
+
+    for name in (
+        MANIFEST_FILE,
+        BM25_FILE,
+        NUMPY_VECTORS_FILE,
+        NUMPY_METADATA_FILE,
+        CHECKPOINT_FILE,
+    ):
+        path = os.path.join(persist_directory, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def build_chroma_vectorstore(
+    chunks, persist_directory=CHROMA_DIR, ids=None, mode="full", plan=None, meters=None
+):
     """
     Embeds chunks and stores them in a Chroma vector database.
+    If ids are given (aligned with chunks), they are used as the Chroma document IDs and
+    committed batches are checkpointed, so a rerun after a failure resumes where it stopped.
+    chunks and ids may be generators when plan identifies the run (see plan_fingerprint).
+    Chunks are embedded in token-packed batches, several at a time (see embedding_batcher).
+    The caller marks the index complete with mark_index_complete once the build succeeds.
+    If meters (upstream StageMeters) are given, per-stage throughput is logged.
+    """
+    from embedding_batcher import embed_and_store
+
+    checkpoint = None
+    if ids is not None:
+        if plan is None:
+            ids = list(ids)
+            plan = fingerprint(ids)
+        checkpoint = IngestCheckpoint(persist_directory)
+        checkpoint.begin(plan, mode)
+    embeddings = get_embeddings()
+    vectorstore = Chroma(
+        persist_directory=persist_directory, embedding_function=embeddings
+    )
+    stats = embed_and_store(
+        chunks, vectorstore, embeddings, ids=ids, checkpoint=checkpoint
+    )
+    if meters is not None:
+        from pipeline_metrics import log_stage_stats
+
+        log_stage_stats(meters, stats)
+    if getattr(embeddings, "cache", None) is not None:
+        stats = embeddings.cache.stats()
+        output_log(
+            f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries stored."
+        )
+    return vectorstore
+
+
+def get_chroma_retriever(vectorstore, k=None, persist_directory=CHROMA_DIR):
+    """
+    Returns a retriever from the vector store, retrieving up to k chunks (RETRIEVER_K by default).
+    With HYBRID_ENABLED, vector hits are fused with BM25 hits from the local lexical index;
+    with ADAPTIVE_K_ENABLED, k is an upper bound and the relevance scores decide the cut.
+    With ROUTER_ENABLED, each query is routed first and searches only the chunks of its route;
+    people questions are resolved with the people index when PEOPLE_INDEX_ENABLED.
+    With RERANK_ENABLED, RERANK_CANDIDATES chunks are fetched and the reranker keeps the best
+    RERANK_TOP_N (replacing the adaptive cut).
+    With CONTEXT_PACKING_ENABLED, the chunks are merged, deduplicated and packed into
+    CONTEXT_MAX_TOKENS before they reach the prompt.
+    """
+    if k is None:
+        k = RETRIEVER_K
+    fetch_k = max(k, RERANK_CANDIDATES) if RERANK_ENABLED else None
+    hybrid = None
+    if HYBRID_ENABLED or ADAPTIVE_K_ENABLED:
+        from functools import partial
+        from retrievers import HybridRetriever
+        from bm25_index import get_bm25_index
+
+        hybrid = HybridRetriever(
+            vectorstore=vectorstore,
+            lexical_index=(
+                partial(get_bm25_index, persist_directory) if HYBRID_ENABLED else None
+            ),
+            k=fetch_k or k,
+            adaptive=ADAPTIVE_K_ENABLED and not RERANK_ENABLED,
+        )
+    if ROUTER_ENABLED:
+        from retrievers import RoutedRetriever
+        from query_router import route_query
+        from people_index import people_documents
+
+        retriever = RoutedRetriever(
+            vectorstore=vectorstore,
+            route=route_query,
+            k=k,
+            people_lookup=people_documents if PEOPLE_INDEX_ENABLED else None,
+            search=hybrid.search if hybrid is not None else None,
+            fetch_k=fetch_k,
+        )
+    elif hybrid is not None:
+        retriever = hybrid
+    else:
+        retriever = vectorstore.as_retriever(search_kwargs={"k": fetch_k or k})
+    if RERANK_ENABLED:
+        from retrievers import RerankRetriever
+
+        retriever = RerankRetriever(
+            retriever=retriever, top_n=RERANK_TOP_N, budget_ms=RERANK_BUDGET_MS
+        )
+    if CONTEXT_PACKING_ENABLED:
+        from retrievers import PackedRetriever
+
+        return PackedRetriever(retriever=retriever, max_tokens=CONTEXT_MAX_TOKENS)
+    return retriever
+
+
+def open_vectorstore(persist_directory=CHROMA_DIR):
+    """
+    Opens the persisted index for queries with the VECTOR_STORE_BACKEND backend: Chroma, or
+    its memory-mapped NumPy export (falls back to Chroma while there is no index manifest).
+    """
+    embeddings = get_embeddings()
+    if VECTOR_STORE_BACKEND == "numpy":
+        from numpy_vectorstore import get_numpy_vectorstore
+
+        vectorstore = get_numpy_vectorstore(persist_directory, embeddings)
+        if vectorstore is not None:
+            return vectorstore
+    return Chroma(persist_directory=persist_directory, embedding_function=embeddings)
+
+
+def get_lazy_retriever(persist_directory=CHROMA_DIR):
+    """
+    Returns a retriever over the persisted index that opens the vector store and
+    embedding client on the first query instead of at startup.
     """
-    # To avoid OpenAI's max tokens per request error, reduce the number of chunks per batch
-    # We'll break the chunks into smaller batches and add them incrementally
-    embeddings = OpenAIEmbeddings()
-    from math import ceil
+    from retrievers import LazyRetriever
 
-    from config import BATCH_SIZE
+    def build():
+        return get_chroma_retriever(open_vectorstore(persist_directory))
 
-    batch_size = BATCH_SIZE
-    all_vectorstore = None
+    return LazyRetriever(factory=build)
 
-    for i in range(0, len(chunks), batch_size):
-        batch = chunks[i : i + batch_size]
-        if all_vectorstore is None:
-            all_vectorstore = Chroma.from_documents(
-                batch, embeddings, persist_directory=persist_directory
-            )
-        else:
-            all_vectorstore.add_documents(batch)
-    return all_vectorstore
 
+def iter_indexed_chunks(persist_directory=CHROMA_DIR, page_size=5000):
+    """
+    Streams (text, source) for every chunk stored in the Chroma collection.
+    """
+    collection = Chroma(persist_directory=persist_directory)._collection
+    offset = 0
+    while True:
+        page = collection.get(
+            limit=page_size, offset=offset, include=["documents", "metadatas"]
+        )
+        if not page["ids"]:
+            return
+        for text, metadata in zip(page["documents"], page["metadatas"]):
+            yield text, (metadata or {}).get("source", "")
+        offset += len(page["ids"])
 
-def get_chroma_retriever(vectorstore, k=10):
+
+def ingest_documents(
+    docs, file_hashes, mode="full", persist_directory=CHROMA_DIR, indexed=None
+):
     """
-    Returns a retriever from the Chroma vector store, retrieving up to k chunks.
+    Runs the streaming ingestion pipeline: docs -> chunks -> dedup -> (id, chunk) -> embed -> Chroma.
+    Nothing is materialised in full; memory is bounded by the embedding batcher's in-flight window.
+    indexed, if given, streams the (text, source) chunks already in the index, so new chunks
+    are deduplicated against them as well. Files that lost chunks to dedup record the files
+    holding the kept copies as "duplicate_of" in their manifest entry.
+
+    Returns:
+        tuple: (vectorstore, manifest "files" mapping for the ingested sources)
     """
-    from config import RETRIEVER_K
+    from pipeline_metrics import StageMeter
 
-    return vectorstore.as_retriever(search_kwargs={"k": RETRIEVER_K})
+    load_meter = StageMeter("load")
+    chunk_meter = StageMeter("chunk", upstream=load_meter)
+    chunks = chunk_meter.wrap(
+        number_chunks(iter_chunks(load_meter.wrap(add_source_metadata(docs))))
+    )
+    meters = [load_meter, chunk_meter]
+    dedup = None
+    if DEDUP_ENABLED:
+        from dedup import NearDuplicateFilter
+
+        dedup = NearDuplicateFilter()
+        if indexed is not None:
+            dedup.seed(indexed)
+        dedup_meter = StageMeter("dedup", upstream=chunk_meter)
+        chunks = dedup_meter.wrap(dedup.filter(chunks))
+        meters.append(dedup_meter)
+
+    files = {}
+    id_pairs, chunk_pairs = itertools.tee(iter_chunk_ids(chunks, file_hashes, files))
+    vectorstore = build_chroma_vectorstore(
+        (chunk for _, chunk in chunk_pairs),
+        persist_directory,
+        ids=(chunk_id for chunk_id, _ in id_pairs),
+        mode=mode,
+        plan=plan_fingerprint(file_hashes),
+        meters=meters,
+    )
+    if dedup is not None:
+        dedup.report()
+        for source, owners in dedup.duplicates.items():
+            if source in files:
+                files[source]["duplicate_of"] = sorted(owners)
+    return vectorstore, files
 
 
 # --- Main RAG Pipeline Entrypoint ---
 def setup_rag_pipeline(directories=None, force_rebuild=False):
     """
     Loads, chunks, embeds, and sets up Chroma retriever for RAG.
-    If force_rebuild is True, always rebuilds the index and pickle.
+    If force_rebuild is True, always rebuilds the index and document store.
     """
     if force_rebuild:
         return refresh_rag_pipeline(directories)
-    # If ChromaDB exists, just load it (fast!)
-    if os.path.exists(CHROMA_DIR) and os.path.exists(DOCS_PICKLE):
-        vectorstore = Chroma(
-            persist_directory=CHROMA_DIR, embedding_function=OpenAIEmbeddings()
+    # A build that was interrupted part-way must not be served as if complete
+    if os.path.exists(CHROMA_DIR) and not is_index_complete(CHROMA_DIR):
+        checkpoint = IngestCheckpoint(CHROMA_DIR)
+        output_log(
+            "ChromaDB index is incomplete (interrupted build), resuming ingestion."
+        )
+        return refresh_rag_pipeline(
+            directories, incremental=checkpoint.mode == "incremental"
+        )
+    # If ChromaDB exists and passes the local health check, serve it lazily (no network at startup)
+    if os.path.exists(CHROMA_DIR):
+        from index_health import check_index_health
+
+        health = check_index_health(
+            CHROMA_DIR, load_manifest(), chunk_metadata=CHUNK_METADATA_VERSION
+        )
+        if health["healthy"]:
+            return get_lazy_retriever()
+        output_log(
+            f"ChromaDB index failed the health check ({'; '.join(health['problems'])}), rebuilding."
         )
-        try:
-            retriever = get_chroma_retriever(vectorstore)
-            _ = retriever.get_relevant_documents("test")
-            debug_log("Retrieval with k=40 succeeded.")
-            return retriever
-        except Exception as e:
-            debug_log(f"Retrieval with k=40 failed: {e}. Falling back to k=20.")
-            retriever = get_chroma_retriever(vectorstore)
-            return retriever
 
     # Otherwise, build everything
-    if os.path.exists(DOCS_PICKLE):
-        docs = load_docs_from_pickle()
-    else:
-        docs = consolidate_and_serialize_docs(directories)
-    chunks = chunk_documents(docs)
-    vectorstore = build_chroma_vectorstore(chunks)
-    # Try k=30 first
-    try:
-        retriever = get_chroma_retriever(vectorstore)
-        _ = retriever.get_relevant_documents("test")
-        debug_log("Retrieval with k=30 succeeded.")
-        return retriever
-    except Exception as e:
-        debug_log(f"Retrieval with k=30 failed: {e}. Falling back to k=20.")
-        retriever = get_chroma_retriever(vectorstore)
-        return retriever
+    return refresh_rag_pipeline(directories)
 
 
-def refresh_rag_pipeline(directories=None):
+def refresh_rag_pipeline(directories=None, incremental=False):
     """
-    Force a full refresh: re-chunk, re-embed, and overwrite the .pkl and ChromaDB vector store.
+    Force a full refresh: re-chunk, re-embed, and overwrite the document store and ChromaDB vector store.
     Use this after adding new docs or changing doc paths.
+    If incremental is True, only files added, changed or removed since the last build are re-indexed.
     """
     if directories is None:
         directories = DOC_DIRECTORIES
+    if incremental:
+        return incremental_refresh_rag_pipeline(directories)
 
-    # Remove old .pkl and chroma_db if they exist
-    import shutil
+    file_hashes = {
+        file: file_content_hash(file) for file in list_markdown_files(directories)
+    }
+    checkpoint = IngestCheckpoint(CHROMA_DIR)
+    if checkpoint.in_progress() and checkpoint.plan == plan_fingerprint(file_hashes):
+        # Same files and settings as the interrupted build: keep its committed batches
+        output_log("Resuming interrupted RAG index build from the last checkpoint.")
+    else:
+        # Clear the old index if it exists (the document store is rewritten below)
+        clear_chroma_index()
 
-    if os.path.exists(DOCS_PICKLE):
-        os.remove(DOCS_PICKLE)
-    if os.path.exists(CHROMA_DIR):
-        shutil.rmtree(CHROMA_DIR)
+    doc_store = load_doc_store()
+    if doc_store is not None and doc_store.meta == doc_store_meta(file_hashes):
+        # The markdown has not changed since the store was written: chunk straight from it
+        output_log(f"Chunking from the document store ({DOCS_STORE}).")
+        _, files = ingest_documents(doc_store.iter_docs(), file_hashes)
+    else:
+        # Stream docs into the document store while they are chunked and embedded
+        with DocStoreWriter(DOCS_STORE, meta=doc_store_meta(file_hashes)) as writer:
+            docs = writer.passthrough(iter_markdown_files(list(file_hashes)))
+            _, files = ingest_documents(docs, file_hashes)
+    mark_index_complete(files)
+    return get_chroma_retriever(open_vectorstore())
 
-    # Rebuild everything
-    docs = consolidate_and_serialize_docs(directories)
-    chunks = chunk_documents(docs)
-    vectorstore = build_chroma_vectorstore(chunks)
-    # Try k=30 first
-    try:
-        retriever = get_chroma_retriever(vectorstore)
-        _ = retriever.get_relevant_documents("test")
-        debug_log("Retrieval with k=30 succeeded.")
-        return retriever
-    except Exception as e:
-        debug_log(f"Retrieval with k=30 failed: {e}. Falling back to k=20.")
-        retriever = get_chroma_retriever(vectorstore)
-        return retriever
+
+def incremental_refresh_rag_pipeline(directories=None):
+    """
+    Re-indexes only the Markdown files that were added, changed or removed since the last build.
+
+    Compares per-file content hashes against the index manifest, deletes the stale chunk IDs
+    from Chroma, re-chunks and re-embeds only the affected files, and updates the document store.
+    Falls back to a full refresh when there is no manifest or vector store to update.
+    """
+    if directories is None:
+        directories = DOC_DIRECTORIES
+    manifest = load_manifest()
+    if manifest is None or not os.path.exists(CHROMA_DIR):
+        output_log("No index manifest found, running a full rebuild.")
+        return refresh_rag_pipeline(directories)
+    if manifest.get("chunk_metadata") != CHUNK_METADATA_VERSION:
+        output_log("Indexed chunks carry outdated metadata, running a full rebuild.")
+        return refresh_rag_pipeline(directories)
+
+    old_files = manifest.get("files", {})
+    current_hashes = {
+        file: file_content_hash(file) for file in list_markdown_files(directories)
+    }
+    added = [f for f in current_hashes if f not in old_files]
+    changed = [
+        f
+        for f in current_hashes
+        if f in old_files and old_files[f].get("sha256") != current_hashes[f]
+    ]
+    removed = [f for f in old_files if f not in current_hashes]
+    # A file whose duplicate chunks were dropped in favour of another file's copy loses that
+    # content when the other file changes or is removed, so it is re-ingested as well
+    # (and, in turn, the files depending on it)
+    affected = set(changed + removed)
+    dependents = []
+    while True:
+        found = [
+            f
+            for f in current_hashes
+            if f in old_files
+            and f not in affected
+            and affected.intersection(old_files[f].get("duplicate_of", ()))
+        ]
+        if not found:
+            break
+        affected.update(found)
+        dependents.extend(found)
+    output_log(
+        f"Incremental refresh: {len(added)} added, {len(changed)} changed, "
+        f"{len(removed)} removed, {len(dependents)} re-ingested for dropped duplicates, "
+        f"{len(current_hashes) - len(added) - len(changed) - len(dependents)} unchanged."
+    )
+
+    vectorstore = Chroma(
+        persist_directory=CHROMA_DIR, embedding_function=get_embeddings()
+    )
+    if not (added or changed or removed):
+        return get_chroma_retriever(open_vectorstore())
+
+    reingested = added + changed + dependents
+    stale_ids = [
+        chunk_id
+        for f in changed + removed + dependents
+        for chunk_id in old_files[f]["chunk_ids"]
+    ]
+    if stale_ids:
+        vectorstore.delete(ids=stale_ids)
+        debug_log(f"Deleted {len(stale_ids)} stale chunks from ChromaDB")
+
+    new_docs = load_markdown_files(reingested)
+    new_files = {}
+    if new_docs:
+        _, new_files = ingest_documents(
+            new_docs,
+            {f: current_hashes[f] for f in reingested},
+            mode="incremental",
+            indexed=iter_indexed_chunks() if DEDUP_ENABLED else None,
+        )
+
+    files = {f: entry for f, entry in old_files.items() if f in current_hashes}
+    files.update(new_files)
+    mark_index_complete(files)
+
+    # Keep the document store in sync: copy untouched records, then append the new ones
+    touched = set(reingested + removed)
+    doc_store = load_doc_store()
+    kept = []
+    meta = None
+    if doc_store is not None:
+        kept = [s for s in doc_store.sources() if s not in touched]
+        # The store stays reusable if its copies of the untouched files are current
+        stored = (doc_store.meta or {}).get("files", {})
+        if (doc_store.meta or {}).get("loader") == loader_id() and all(
+            stored.get(f) == current_hashes[f]
+            for f in current_hashes
+            if f not in touched
+        ):
+            meta = doc_store_meta(current_hashes)
+    with DocStoreWriter(DOCS_STORE, meta=meta) as writer:
+        if kept:
+            writer.add_all(doc_store.iter_docs(kept))
+        writer.add_all(new_docs)
+
+    return get_chroma_retriever(open_vectorstore())
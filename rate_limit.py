@@ -0,0 +1,256 @@
+"""
+Adaptive rate-limit controller for OpenAI API calls.
+
+- AIMD concurrency limit: additive increase on success, multiplicative decrease on 429
+- Honours retry-after / retry-after-ms and x-ratelimit-* response headers
+- Pauses all callers until the quota resets when the remaining budget runs out
+- Plugs into the OpenAI clients as an httpx transport, so embeddings and chat share one controller
+"""
+
+import re
+import time
+import random
+import threading
+
+import httpx
+
+from log_utils import debug_log
+from config import (
+    RATE_LIMIT_INITIAL_CONCURRENCY,
+    RATE_LIMIT_MIN_CONCURRENCY,
+    RATE_LIMIT_MAX_CONCURRENCY,
+    RATE_LIMIT_MAX_RETRIES,
+    RATE_LIMIT_ENABLED,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+)
+
+RETRYABLE_STATUS_CODES = {429, 503}
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value):
+    """
+    Parses durations used in OpenAI rate-limit headers ("20ms", "1s", "6m0s", "1.5") into seconds.
+    Returns None if the value cannot be parsed.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(headers):
+    """
+    Returns the server-requested retry delay in seconds, or None if the response has none.
+    """
+    if "retry-after-ms" in headers:
+        delay = parse_duration(headers["retry-after-ms"])
+        if delay is not None:
+            return delay / 1000
+    return parse_duration(headers.get("retry-after"))
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+class AdaptiveRateController:
+    """
+    Shared AIMD concurrency limiter.
+
+    Callers wrap each request in `with controller.slot():` and report the outcome with
+    on_success(headers) or on_rate_limited(headers, attempt).
+    """
+
+    def __init__(
+        self,
+        initial_limit=RATE_LIMIT_INITIAL_CONCURRENCY,
+        min_limit=RATE_LIMIT_MIN_CONCURRENCY,
+        max_limit=RATE_LIMIT_MAX_CONCURRENCY,
+        decrease_factor=0.5,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.successes = 0
+        self.rate_limited = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                if self.in_flight < max(self.min_limit, int(self.limit)):
+                    self.in_flight += 1
+                    return
+                self._cond.wait()
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def slot(self):
+        """
+        Context manager that holds one concurrency slot for the duration of a request.
+        """
+        controller = self
+
+        class _Slot:
+            def __enter__(self):
+                controller.acquire()
+
+            def __exit__(self, *exc):
+                controller.release()
+
+        return _Slot()
+
+    def on_success(self, headers):
+        """
+        Additive increase, plus a pause if the response says the quota is exhausted.
+        """
+        with self._cond:
+            self.successes += 1
+            # +1 slot per "window" of limit successful requests, like TCP congestion avoidance
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            for kind in ("requests", "tokens"):
+                remaining = _header_int(headers, f"x-ratelimit-remaining-{kind}")
+                if remaining is not None and remaining <= 0:
+                    reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                    if reset:
+                        self._pause(reset)
+            self._cond.notify_all()
+
+    def on_rate_limited(self, headers, attempt=0):
+        """
+        Multiplicative decrease and a pause for retry-after (or exponential backoff with jitter).
+        Returns the delay in seconds before the request should be retried.
+        """
+        delay = retry_after_seconds(headers)
+        if delay is None:
+            delay = min(60.0, 2**attempt) * (0.5 + random.random())
+        with self._cond:
+            self.rate_limited += 1
+            now = time.monotonic()
+            # Concurrent 429s from one burst count as a single congestion event
+            if now - self._last_decrease > max(delay, 1.0):
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = now
+                debug_log(
+                    f"Rate limited: concurrency limit lowered to {int(self.limit)}, "
+                    f"retrying in {delay:.2f}s"
+                )
+            self._pause(delay)
+            self._cond.notify_all()
+        return delay
+
+    def _pause(self, seconds):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "successes": self.successes,
+                "rate_limited": self.rate_limited,
+            }
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """
+    httpx transport that routes every request through an AdaptiveRateController and
+    retries 429/503 responses after the delay the server asks for.
+    """
+
+    def __init__(self, controller, transport=None, max_retries=RATE_LIMIT_MAX_RETRIES):
+        self.controller = controller
+        self.transport = transport or httpx.HTTPTransport()
+        self.max_retries = max_retries
+
+    def handle_request(self, request):
+        attempt = 0
+        while True:
+            with self.controller.slot():
+                response = self.transport.handle_request(request)
+            if (
+                response.status_code not in RETRYABLE_STATUS_CODES
+                or attempt >= self.max_retries
+            ):
+                if response.status_code < 400:
+                    self.controller.on_success(response.headers)
+                return response
+            response.close()
+            self.controller.on_rate_limited(response.headers, attempt)
+            attempt += 1
+
+    def close(self):
+        self.transport.close()
+
+
+_controller = None
+_http_client = None
+_lock = threading.Lock()
+
+
+def get_rate_controller():
+    """
+    Returns the process-wide rate controller shared by embedding and chat calls.
+    """
+    global _controller
+    with _lock:
+        if _controller is None:
+            _controller = AdaptiveRateController()
+        return _controller
+
+
+def get_http_client():
+    """
+    Returns the process-wide httpx client for OpenAI calls: a keep-alive connection pool,
+    rate limited by the shared controller unless rate limiting is disabled in config.
+    Idle connections are kept for HTTP_KEEPALIVE_EXPIRY seconds, so requests between chat
+    messages reuse an open TLS connection instead of handshaking again.
+    """
+    global _http_client
+    controller = get_rate_controller() if RATE_LIMIT_ENABLED else None
+    with _lock:
+        if _http_client is None:
+            transport = httpx.HTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                )
+            )
+            if controller is not None:
+                transport = RateLimitedTransport(controller, transport)
+            _http_client = httpx.Client(transport=transport, timeout=60.0)
+        return _http_client
+
+
+def openai_client_kwargs():
+    """
+    Returns extra keyword arguments for ChatOpenAI / OpenAIEmbeddings so they use the
+    shared pooled (and rate-limited) HTTP client.
+    """
+    return {"http_client": get_http_client()}
@@ -1,13 +1,37 @@
+import argparse
+
 from rag_pipeline import refresh_rag_pipeline
 from log_utils import debug_log, output_log
-from config import DOC_DIRECTORIES
+from config import DOC_DIRECTORIES, WARM_ANSWERS_ENABLED
 
 
 def main():
-    output_log("Refreshing RAG pipeline: rebuilding .pkl and ChromaDB vector store...")
+    parser = argparse.ArgumentParser(description="Rebuild the RAG index.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-index files added, changed or removed since the last build.",
+    )
+    parser.add_argument(
+        "--skip-warm-answers",
+        action="store_true",
+        help="Do not precompute answers for the curated GUI questions.",
+    )
+    args = parser.parse_args()
+
+    if args.incremental:
+        output_log("Refreshing RAG pipeline incrementally (changed files only)...")
+    else:
+        output_log(
+            "Refreshing RAG pipeline: rebuilding document store and ChromaDB vector store..."
+        )
     debug_log("Building/updating RAG index...")
-    refresh_rag_pipeline(DOC_DIRECTORIES)
+    refresh_rag_pipeline(DOC_DIRECTORIES, incremental=args.incremental)
     debug_log("RAG index build/update complete!")
+    if WARM_ANSWERS_ENABLED and not args.skip_warm_answers:
+        from main import get_app_context
+
+        get_app_context().refresh_warm_answers()
     output_log(
         "RAG pipeline refresh complete. You can now run your assistant and all docs will be available."
     )
@@ -0,0 +1,187 @@
+"""
+CPU-only reranking of retrieved chunks before they reach the prompt.
+
+- A wide candidate set (RERANK_CANDIDATES) is rescored and only the best RERANK_TOP_N are
+  kept, so the LLM reads a few relevant chunks instead of sorting through many
+- "features" scores lexical features (query term coverage, shared bigrams, heading
+  matches) blended with the retrieval rank; it needs no model and takes well under a ms
+- "cross-encoder" scores (query, chunk) pairs with a small sentence-transformers model on
+  the CPU. sentence-transformers is optional: the model loads in the background and the
+  feature scorer is used until it is ready, or for good if it is not installed
+- Every reranking has a hard latency budget (RERANK_BUDGET_MS); when it is exceeded the
+  reranking is bypassed and the retrieval order is kept. Scoring cannot be interrupted, so
+  while an over-budget scoring is still running, or every worker is busy, new queries skip
+  reranking instead of queueing behind it
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from log_utils import debug_log, output_log
+from config import RERANKER, RERANKER_MODEL, RERANK_TOP_N, RERANK_BUDGET_MS
+from search_utils import tokenize, STOPWORDS
+
+# Feature weights of FeatureScorer
+COVERAGE_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.5
+HEADING_WEIGHT = 0.5
+RANK_WEIGHT = 0.5
+# Scoring threads; queries arriving while all of them are busy are not reranked
+RERANK_WORKERS = 2
+
+
+class FeatureScorer:
+    """
+    Scores chunks by how much of the query they contain, with the retrieval rank as a prior.
+    """
+
+    name = "features"
+
+    def score(self, query, docs):
+        terms = [t for t in tokenize(query) if t not in STOPWORDS]
+        unique_terms = set(terms)
+        bigrams = set(zip(terms, terms[1:]))
+        scores = []
+        for rank, doc in enumerate(docs):
+            tokens = tokenize(doc.page_content)
+            token_set = set(tokens)
+            heading = set(tokenize(doc.metadata.get("heading_path", "")))
+            coverage = len(unique_terms & token_set) / len(unique_terms) if terms else 0
+            shared_bigrams = (
+                len(bigrams & set(zip(tokens, tokens[1:]))) / len(bigrams)
+                if bigrams
+                else 0
+            )
+            heading_match = (
+                len(unique_terms & heading) / len(unique_terms) if terms else 0
+            )
+            scores.append(
+                COVERAGE_WEIGHT * coverage
+                + BIGRAM_WEIGHT * shared_bigrams
+                + HEADING_WEIGHT * heading_match
+                + RANK_WEIGHT / (1 + rank)
+            )
+        return scores
+
+
+class CrossEncoderScorer:
+    """
+    Scores (query, chunk) pairs with a sentence-transformers CrossEncoder on the CPU.
+    The model is loaded in a background thread; ready is False until it has loaded.
+    """
+
+    name = "cross-encoder"
+
+    def __init__(self, model_name=RERANKER_MODEL):
+        self.model_name = model_name
+        self.model = None
+        threading.Thread(target=self._load, name="reranker-load", daemon=True).start()
+
+    def _load(self):
+        started = time.perf_counter()
+        try:
+            from sentence_transformers import CrossEncoder
+
+            self.model = CrossEncoder(self.model_name, device="cpu")
+        except Exception as e:
+            output_log(f"Cross-encoder reranker unavailable, using features: {e}")
+            return
+        debug_log(
+            f"Loaded reranker {self.model_name} in {time.perf_counter() - started:.1f}s"
+        )
+
+    @property
+    def ready(self):
+        return self.model is not None
+
+    def score(self, query, docs):
+        return [
+            float(s)
+            for s in self.model.predict([(query, doc.page_content) for doc in docs])
+        ]
+
+
+_lock = threading.Lock()
+_scorers = {}
+_executor = None
+_running = 0  # Scorings submitted and not finished
+_overrunning = 0  # Of those, the ones that exceeded their budget
+
+
+def get_scorer():
+    """
+    Returns the configured scorer, or the feature scorer while the cross-encoder is not usable.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=RERANK_WORKERS, thread_name_prefix="rerank"
+            )
+        if "features" not in _scorers:
+            _scorers["features"] = FeatureScorer()
+        if RERANKER == "cross-encoder" and "cross-encoder" not in _scorers:
+            _scorers["cross-encoder"] = CrossEncoderScorer()
+    scorer = _scorers.get(RERANKER)
+    if scorer is None or not getattr(scorer, "ready", True):
+        return _scorers["features"]
+    return scorer
+
+
+def rerank(query, docs, top_n=RERANK_TOP_N, budget_ms=RERANK_BUDGET_MS):
+    """
+    Returns the top_n of docs by reranker score. When scoring does not finish within
+    budget_ms, the first top_n docs in retrieval order are returned instead.
+    """
+    global _running
+    if len(docs) <= top_n:
+        return docs
+    scorer = get_scorer()
+    with _lock:
+        if _overrunning or _running >= RERANK_WORKERS:
+            debug_log(
+                f"Reranking skipped: {_running} scorings still running "
+                f"({_overrunning} over budget), keeping the retrieval order"
+            )
+            return docs[:top_n]
+        _running += 1
+    started = time.perf_counter()
+    overrun = threading.Event()
+    future = _executor.submit(scorer.score, query, docs)
+    future.add_done_callback(lambda _: _finished(overrun))
+    try:
+        scores = future.result(timeout=budget_ms / 1000)
+    except TimeoutError:
+        _overran(future, overrun)
+        debug_log(
+            f"Reranking ({scorer.name}) exceeded its {budget_ms}ms budget, "
+            f"keeping the retrieval order"
+        )
+        return docs[:top_n]
+    except Exception as e:
+        debug_log(f"Reranking ({scorer.name}) failed, keeping the retrieval order: {e}")
+        return docs[:top_n]
+    order = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)[:top_n]
+    debug_log(
+        f"Reranked {len(docs)} chunks ({scorer.name}) in "
+        f"{(time.perf_counter() - started) * 1000:.1f}ms, kept ranks {order}"
+    )
+    return [docs[i] for i in order]
+
+
+def _overran(future, overrun):
+    global _overrunning
+    with _lock:
+        # The done callback may already have run; only count scorings still running
+        if not future.done():
+            overrun.set()
+            _overrunning += 1
+
+
+def _finished(overrun):
+    global _running, _overrunning
+    with _lock:
+        _running -= 1
+        if overrun.is_set():
+            _overrunning -= 1
@@ -0,0 +1,254 @@
+"""
+Retrievers used by the Vyaguta Assistant RAG workflow.
+
+- LazyRetriever defers building the underlying retriever (embedding client, Chroma
+  collection) until the first query, so starting the app does no retrieval work
+- RoutedRetriever routes each query (see query_router) and searches only the chunks of
+  its route, with the route's chunk budget; people questions are looked up in the exact
+  people index first
+- HybridRetriever fuses vector and BM25 hits (see bm25_index) with reciprocal rank fusion
+  and can cut the result at a relevance score threshold or gap (adaptive k)
+- The chosen k and the context size in tokens are logged per query, with a running median
+- RerankRetriever rescores a wide candidate set and keeps the best few (see reranker)
+- PackedRetriever merges, deduplicates and packs the retrieved chunks into a token budget
+"""
+
+import threading
+from collections import deque
+from statistics import median
+from typing import Any, Callable, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+
+from log_utils import debug_log
+from config import (
+    HYBRID_CANDIDATES,
+    HYBRID_RRF_K,
+    ADAPTIVE_K_MIN,
+    ADAPTIVE_K_MIN_SCORE,
+    ADAPTIVE_K_MAX_GAP,
+)
+
+_build_lock = threading.Lock()
+# Context sizes (tokens) of recent queries, for the running median in the logs
+_context_tokens = deque(maxlen=1000)
+
+
+def log_context_size(label, docs, k):
+    """
+    Logs how many chunks (out of at most k) and context tokens a query retrieved.
+    """
+    from context_packer import count_tokens
+
+    tokens = sum(count_tokens(doc.page_content) for doc in docs)
+    _context_tokens.append(tokens)
+    debug_log(
+        f"{label}: {len(docs)} chunks (k={k}), {tokens} context tokens "
+        f"(median {median(_context_tokens):.0f} over the last {len(_context_tokens)} queries)"
+    )
+
+
+def adaptive_k(scores, min_score, max_gap, min_k, max_k):
+    """
+    Returns how many of the descending relevance scores to keep: those at or above
+    min_score, up to the first drop larger than max_gap, bounded to [min_k, max_k].
+    """
+    keep = 0
+    for i, score in enumerate(scores[:max_k]):
+        if score < min_score or (i and scores[i - 1] - score > max_gap):
+            break
+        keep += 1
+    return max(keep, min(min_k, max_k, len(scores)))
+
+
+class LazyRetriever(BaseRetriever):
+    """
+    Retriever that calls factory() on first use and delegates to the retriever it returns.
+    """
+
+    factory: Callable[[], BaseRetriever]
+    retriever: Optional[BaseRetriever] = None
+
+    def get_retriever(self) -> BaseRetriever:
+        """
+        Returns the underlying retriever, building it on first call.
+        """
+        if self.retriever is None:
+            with _build_lock:
+                if self.retriever is None:
+                    debug_log("Building retriever on first use")
+                    self.retriever = self.factory()
+        return self.retriever
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self.get_retriever().invoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+
+
+class RoutedRetriever(BaseRetriever):
+    """
+    Vector store retriever that asks route(query) for a Route (query_router.Route) and
+    applies its metadata filter and k. Routes without retrieval return no documents; a
+    filter that matches nothing falls back to the unfiltered search with k chunks.
+    people_lookup(query), if set, answers people-routed queries with the exact matching
+    records; when it finds nobody the query is searched unfiltered, since the "who is"
+    rule also catches questions that are not about a person. search(query, k, filter),
+    if set, replaces the plain vector search (e.g. HybridRetriever.search). fetch_k, if set,
+    is fetched for every route instead of its own k (wide candidates for a reranker).
+    """
+
+    vectorstore: VectorStore
+    route: Callable[[str], Any]
+    k: int = 40
+    people_lookup: Optional[Callable[[str], List[Document]]] = None
+    search: Optional[Callable[[str, int, Optional[dict]], List[Document]]] = None
+    fetch_k: Optional[int] = None
+
+    def _search(self, query, k, filter=None):
+        if self.search is not None:
+            return self.search(query, k, filter)
+        return self.vectorstore.similarity_search(query, k=k, filter=filter)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        route = self.route(query)
+        if not route.retrieve:
+            return []
+        if route.name == "people" and self.people_lookup is not None:
+            docs = self.people_lookup(query)
+            if docs:
+                log_context_size("Route people (people index)", docs, len(docs))
+                return docs
+            debug_log("People index matched nobody, searching everything")
+            route = route._replace(name="all", filter=None, k=self.k)
+        k = self.fetch_k or route.k or self.k
+        docs = self._search(query, k, route.filter)
+        if not docs and route.filter is not None:
+            debug_log(f"Route {route.name} matched no chunks, searching everything")
+            k = self.fetch_k or self.k
+            docs = self._search(query, k)
+        log_context_size(f"Route {route.name}", docs, k)
+        return docs
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retrieves up to k chunks by reciprocal rank fusion of a vector search and a BM25 search
+    over the same Chroma collection. lexical_index() returns the BM25Index (no lexical_index,
+    or None, uses the vector search alone). With adaptive, fewer than k chunks are kept
+    when the vector relevance scores fall below min_score or drop by more than max_gap.
+    """
+
+    vectorstore: VectorStore
+    lexical_index: Optional[Callable[[], Any]] = None
+    k: int = 20
+    candidates: int = HYBRID_CANDIDATES
+    rrf_k: int = HYBRID_RRF_K
+    adaptive: bool = False
+    min_k: int = ADAPTIVE_K_MIN
+    min_score: float = ADAPTIVE_K_MIN_SCORE
+    max_gap: float = ADAPTIVE_K_MAX_GAP
+
+    def search(self, query, k, filter=None):
+        """
+        Returns up to k of the best fused chunks for query among those matching filter.
+        """
+        n = max(k, self.candidates)
+        scored = self.vectorstore.similarity_search_with_relevance_scores(
+            query, k=n, filter=filter
+        )
+        vector_docs = [doc for doc, _ in scored]
+        if self.adaptive:
+            scores = [score for _, score in scored]
+            k = adaptive_k(scores, self.min_score, self.max_gap, self.min_k, k)
+            if scores:
+                debug_log(
+                    f"Adaptive k={k}: relevance scores {scores[0]:.2f} (best) to "
+                    f"{scores[max(k - 1, 0)]:.2f} (last kept)"
+                )
+        lexical = self.lexical_index() if self.lexical_index is not None else None
+        if lexical is None:
+            return vector_docs[:k]
+        hits = lexical.search(query, n, filter)
+        lexical_docs = []
+        if hits:
+            found = self.vectorstore.get(
+                ids=[chunk_id for chunk_id, _ in hits],
+                include=["documents", "metadatas"],
+            )
+            by_id = {
+                chunk_id: Document(page_content=text, metadata=metadata or {})
+                for chunk_id, text, metadata in zip(
+                    found["ids"], found["documents"], found["metadatas"]
+                )
+            }
+            lexical_docs = [by_id[c] for c, _ in hits if c in by_id]
+
+        scores, docs = {}, {}
+        for results in (vector_docs, lexical_docs):
+            for rank, doc in enumerate(results):
+                key = (doc.metadata.get("source"), doc.page_content)
+                scores[key] = scores.get(key, 0.0) + 1.0 / (self.rrf_k + rank + 1)
+                docs.setdefault(key, doc)
+        fused = sorted(scores, key=scores.get, reverse=True)[:k]
+        debug_log(
+            f"Hybrid search: {len(vector_docs)} vector + {len(lexical_docs)} BM25 hits, "
+            f"{len(vector_docs) + len(lexical_docs) - len(scores)} in both, kept {len(fused)}"
+        )
+        return [docs[key] for key in fused]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        docs = self.search(query, self.k)
+        log_context_size("Hybrid search", docs, self.k)
+        return docs
+
+
+class PackedRetriever(BaseRetriever):
+    """
+    Packs the documents returned by retriever into max_tokens (see context_packer).
+    """
+
+    retriever: BaseRetriever
+    max_tokens: int
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        from context_packer import pack_context
+
+        docs = self.retriever.invoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+        return pack_context(docs, self.max_tokens)
+
+
+class RerankRetriever(BaseRetriever):
+    """
+    Reranks the candidates returned by retriever and keeps the best top_n (see reranker).
+    Exact people-index matches are returned as they are.
+    """
+
+    retriever: BaseRetriever
+    top_n: int
+    budget_ms: int
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        from reranker import rerank
+
+        docs = self.retriever.invoke(
+            query, config={"callbacks": run_manager.get_child()}
+        )
+        if docs and all("person" in doc.metadata for doc in docs):
+            return docs
+        return rerank(query, docs, self.top_n, self.budget_ms)
@@ -0,0 +1,73 @@
+"""
+Helpers shared by the local search structures (BM25 index, NumPy vector store, people
+index, query router and reranker).
+
+- tokenize: the lowercase alphanumeric tokenization they all match on
+- STOPWORDS: question words that carry no content ("what", "how", "the", ...)
+- matches_filter / FilterMasks: Chroma-style metadata filters ($and, $or, $eq, $ne, $in,
+  $nin) evaluated locally, with one cached row mask per filter
+"""
+
+import re
+import json
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Question words that carry no content
+STOPWORDS = {
+    "a", "about", "an", "and", "are", "at", "be", "by", "can", "describe", "detail", "do",
+    "does", "explain", "for", "from", "how", "i", "in", "is", "it", "me", "my", "of", "on",
+    "or", "please", "tell", "the", "to", "what", "when", "where", "which", "who", "why",
+    "with",
+}  # fmt: skip
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def matches_filter(metadata, where):
+    """
+    True if metadata satisfies the Chroma-style where filter.
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, c) for c in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class FilterMasks:
+    """
+    Boolean masks over metadatas (one entry per row) for where filters. Filters come from
+    a handful of query routes, so each mask is computed once and reused.
+    """
+
+    def __init__(self, metadatas):
+        self.metadatas = metadatas
+        self._masks = {}
+
+    def get(self, where):
+        import numpy as np
+
+        key = json.dumps(where, sort_keys=True)
+        if key not in self._masks:
+            self._masks[key] = np.array(
+                [matches_filter(m or {}, where) for m in self.metadatas], dtype=bool
+            )
+        return self._masks[key]
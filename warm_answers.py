@@ -0,0 +1,160 @@
+"""
+Precomputed ("warm") answers for the curated GUI questions.
+
+- Answers QUICK_QUESTIONS and SURPRISE_QUESTIONS with the QA chain at index-build time
+- Stores them in WARM_ANSWERS_PATH together with the index version and answer namespace
+  (LLM model + prompt) they were computed for
+- Serves an answer only while it matches the current index version and answer namespace,
+  so stale answers are never shown; AppContext.refresh_warm_answers recomputes them in the
+  background
+
+Usage:
+    python warm_answers.py   # recompute the warm answers for the current index
+"""
+
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from log_utils import debug_log, output_log
+from config import (
+    QUICK_QUESTIONS,
+    SURPRISE_QUESTIONS,
+    WARM_ANSWERS_PATH,
+    WARM_ANSWERS_WORKERS,
+)
+
+
+def question_key(question):
+    """
+    Returns the lookup key of a question (whitespace-insensitive).
+    """
+    return " ".join(question.split())
+
+
+def curated_questions():
+    """
+    Returns the Quick and Surprise questions without duplicates, in display order.
+    """
+    return list(
+        dict.fromkeys(question_key(q) for q in QUICK_QUESTIONS + SURPRISE_QUESTIONS)
+    )
+
+
+class WarmAnswers:
+    """
+    Precomputed answers keyed by question, valid for one index version and answer namespace.
+    """
+
+    def __init__(self, index_version=None, namespace=None, answers=None):
+        self.index_version = index_version
+        self.namespace = namespace
+        self.answers = answers or {}
+
+    @classmethod
+    def load(cls, path=WARM_ANSWERS_PATH):
+        """
+        Loads warm answers from path, or returns an empty set if missing or unreadable.
+        """
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            debug_log(f"Could not read warm answers {path}: {e}")
+            return cls()
+        return cls(
+            data.get("index_version"), data.get("namespace"), data.get("answers")
+        )
+
+    def save(self, path=WARM_ANSWERS_PATH):
+        """
+        Writes the warm answers atomically.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "index_version": self.index_version,
+                    "namespace": self.namespace,
+                    "answers": self.answers,
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, path)
+
+    def is_current(self, index_version, namespace):
+        return (
+            bool(self.answers)
+            and self.index_version == index_version
+            and self.namespace == namespace
+        )
+
+    def get(self, question, index_version, namespace):
+        """
+        Returns the QA result ({"query", "result", "source_documents", "cached"}) for a curated
+        question, or None if it has no warm answer for index_version and namespace.
+        """
+        if index_version is None or (index_version, namespace) != (
+            self.index_version,
+            self.namespace,
+        ):
+            return None
+        entry = self.answers.get(question_key(question))
+        if entry is None:
+            return None
+        from answer_cache import deserialize_documents
+
+        return {
+            "query": question,
+            "result": entry["result"],
+            "source_documents": deserialize_documents(entry["sources"]),
+            "cached": True,
+        }
+
+
+def build_warm_answers(qa_chain, index_version, namespace, questions=None, path=None):
+    """
+    Answers every curated question with qa_chain and saves the results for index_version.
+    Questions that fail are left out (and simply go through the chain when asked).
+
+    Returns:
+        WarmAnswers: The new warm answers.
+    """
+    from answer_cache import serialize_documents
+
+    if questions is None:
+        questions = curated_questions()
+    started = time.perf_counter()
+
+    def answer(question):
+        try:
+            return question, qa_chain.invoke({"query": question})
+        except Exception as e:
+            debug_log(f"Warm answer failed for {question!r}: {e}")
+            return question, None
+
+    answers = {}
+    with ThreadPoolExecutor(max_workers=WARM_ANSWERS_WORKERS) as executor:
+        for question, result in executor.map(answer, questions):
+            if result and result.get("result"):
+                answers[question_key(question)] = {
+                    "result": result["result"],
+                    "sources": serialize_documents(result.get("source_documents", [])),
+                }
+    warm = WarmAnswers(index_version, namespace, answers)
+    warm.save(path or WARM_ANSWERS_PATH)
+    output_log(
+        f"Warm answers: {len(answers)} of {len(questions)} curated questions answered "
+        f"in {time.perf_counter() - started:.1f}s."
+    )
+    return warm
+
+
+if __name__ == "__main__":
+    from main import get_app_context
+
+    get_app_context().refresh_warm_answers(force=True)